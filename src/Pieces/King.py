@@ -5,7 +5,10 @@ import logic
 from abstract_piece import AbstractPiece
 from constants import IMAGES, Color
 from squares import Square
+from location import Location
 from move import Move, CastleMove
+from core.constants import color_from_enum
+from core.tables import KING_TARGETS
 
 if TYPE_CHECKING:
     from board import Board
@@ -84,26 +87,17 @@ class King(AbstractPiece):
 
     def getAttackMoves(self, board):
         moveCandidates = []
-        current = self.location
-        choices = [1, 0, -1]
         m = board.map
 
         castling_moves = self.checkCastling(m)
 
         moveCandidates.extend(castling_moves)
-        for i in choices:
-            for j in choices:
-
-                if i == j == 0:
-                    continue
-
-                nextMove = logic.build(current, i, j)
-                if nextSquare := board.map.get(nextMove):
-                    if nextSquare.isOccupied:
-                        if nextSquare.piece.color == self.color:
-                            continue
-                        moveCandidates.append(nextMove)
-                    moveCandidates.append(nextMove)
+        for target in KING_TARGETS[self.location.index]:
+            nextMove = Location.from_index(target)
+            nextSquare = m.get(nextMove)
+            if nextSquare.isOccupied and nextSquare.piece.color == self.color:
+                continue
+            moveCandidates.append(nextMove)
 
         return moveCandidates
 
@@ -111,63 +105,28 @@ class King(AbstractPiece):
         """
         Method to return all possible moves king can make.
 
+        Candidate squares are checked against the opponent's attack map from
+        board.position, which is built once per position and shared with the
+        move generator, rather than searching outwards for attackers.
+
         :param board: current board state
         :type board: class `Board`
         :return: all possible moves the king can make in current position.
         :rtype: `list` of `Location`
         """
-        cur_sqr = self.square
-        allMoves = self.getAttackMoves(board)
+        attacks = board.position.attacks(color_from_enum(self.color) ^ 1)
+        current = self.location.index
         possibleMoves = []
-        m = board.map
-        for move in allMoves:
-            if square := board.map.get(move):
-                rejected = False
-                if square.isOccupied:
-                    continue
-
-                # If free square, we'll check for attackers
-                attackers = []
-
-                # Get all possible attacking squares around the free
-                # Square
-                self._getFileCandidates(attackers, m, move, 1)
-                self._getFileCandidates(attackers, m, move, -1)
-                self._getRankCandidates(attackers, m, move, 1)
-                self._getRankCandidates(attackers, m, move, -1)
-                self._getDiagonalCandidates(attackers, m, move, 1, 1)
-                self._getDiagonalCandidates(attackers, m, move, 1, -1)
-                self._getDiagonalCandidates(attackers, m, move, -1, -1)
-                self._getDiagonalCandidates(attackers, m, move, -1, 1)
-                self._getKnightsMove(attackers, m, move)
-
-                # For each square possible of attacking, we check for
-                # Enemy piece, if so, we can't move there.
-
-                for square in attackers:
-                    if attacker_square := board.get(square):
-                        if (
-                            attacker_square.piece
-                            and attacker_square.piece.color != self.color
-                        ):
-                            attacker = attacker_square.piece
-                            if move in attacker.getAttackMoves(board):
-                                rejected = True
-
-                if rejected:
-                    continue
-                possibleMoves.append(move)
-
-                # if (move.file.value - cur_sqr.file.value) == 2:
-                #     rook_loc = logic.build(self.location, 3, 0)
-                #     rook_piece = board.get(rook_loc).piece
-                #     CastleMove(cur_sqr, move, rook_piece)  # type: ignore
-                # else:  # (destFile - currentFile) == -2:
-                #     rook = logic.build(self.location, -4, 0)  # type: ignore
-                # move = board.get(move)
-                # if move:
-                #     move = Move(cur_sqr, move)
-                #     possibleMoves.append(move)
+        for move in self.getAttackMoves(board):
+            target = move.index
+            if target in attacks:
+                continue
+            # Castling, the king can't leave, or pass through, check.
+            if abs(target - current) == 2 and (
+                current in attacks or (current + target) // 2 in attacks
+            ):
+                continue
+            possibleMoves.append(move)
 
         return possibleMoves
 
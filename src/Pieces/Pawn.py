@@ -1,17 +1,14 @@
 from __future__ import annotations
-from typing import (
-    TYPE_CHECKING,
-    Iterator,
-)
+from typing import Iterator
 import logic
 from abstract_piece import AbstractPiece
 import constants as c
 
 from Pieces.Queen import Queen
 from move import Move, Flag
-
-if TYPE_CHECKING:
-    from location import Location
+from location import Location
+from core.constants import color_from_enum
+from core.tables import PAWN_TARGETS
 
 
 class Pawn(AbstractPiece):
@@ -135,15 +132,11 @@ class Pawn(AbstractPiece):
 
     def getAttackMoves(self, board):
         """
-        Get all attack moves for a pawn. Check for possible enpassant moves also.
+        Get all attack moves for a pawn, looked up from the precomputed pawn
+        table for its colour.
         """
-
-        if self._pieceColor == c.Color.LIGHT:
-            move1 = logic.build(self.location, fileOffset=1, rankOffset=1)
-            move2 = logic.build(self.location, fileOffset=-1, rankOffset=1)
-            return [move1, move2]
-
-        else:
-            move1 = logic.build(self.location, fileOffset=1, rankOffset=-1)
-            move2 = logic.build(self.location, fileOffset=-1, rankOffset=-1)
-            return [move1, move2]
+        color = color_from_enum(self._pieceColor)
+        return [
+            Location.from_index(target)
+            for target in PAWN_TARGETS[color][self.location.index]
+        ]
@@ -7,6 +7,8 @@ from squares import Square
 import pygame
 
 import logic
+from location import Location
+from core.tables import KNIGHT_TARGETS
 
 if TYPE_CHECKING:
     import constants as c
@@ -139,12 +141,6 @@ class AbstractPiece(ABC, pygame.sprite.Sprite):
             square.piece = self
         self.rect.center = square.rect.center
 
-    def set_attrs_from_dict(self, **attrs):
-        for key, value in attrs.items():
-            if key == "_Sprite__g":
-                pass
-            setattr(self, key, value)
-
     def forceMove(self, target_square: Square):
         """
         This method shouldn't be overwritten!
@@ -193,15 +189,14 @@ class AbstractPiece(ABC, pygame.sprite.Sprite):
         :param fileOffset: type `Int` + or - 1 for direction.
 
         """
-        nextMove = logic.build(current, fileOffset, rankOffset)
-        while boardMap.get(nextMove):
-            if boardMap.get(nextMove).isOccupied:
-                if boardMap.get(nextMove).piece.color == self.color:
+        for nextMove in logic.ray_from(current, (fileOffset, rankOffset)):
+            square = boardMap.get(nextMove)
+            if square.isOccupied:
+                if square.piece.color == self.color:
                     break
                 moves.append(nextMove)
                 break
             moves.append(nextMove)
-            nextMove = logic.build(nextMove, fileOffset, rankOffset)
 
     def _getFileCandidates(self, moves, boardMap, current, offset):
         """
@@ -213,15 +208,14 @@ class AbstractPiece(ABC, pygame.sprite.Sprite):
         :param current: type `Location` Current Pieces square.
         :param offset: type `Int` + or - 1 for direction.
         """
-        nextMove = logic.build(current, offset, rankOffset=0)
-        while boardMap.get(nextMove):
-            if boardMap.get(nextMove).isOccupied:
-                if boardMap.get(nextMove).piece.color == self.color:
+        for nextMove in logic.ray_from(current, (offset, 0)):
+            square = boardMap.get(nextMove)
+            if square.isOccupied:
+                if square.piece.color == self.color:
                     break
                 moves.append(nextMove)
                 break
             moves.append(nextMove)
-            nextMove = logic.build(nextMove, offset, rankOffset=0)
 
     def _getRankCandidates(self, moves, boardMap, current, offset):
         """
@@ -233,39 +227,30 @@ class AbstractPiece(ABC, pygame.sprite.Sprite):
         :param current: type `Location` Current Pieces square.
         :param offset: type `Int` + or - 1 for direction.
         """
-        nextMove = logic.build(current, 0, offset)
-        while boardMap.get(nextMove):
-            if boardMap.get(nextMove).isOccupied:
-                if boardMap.get(nextMove).piece.color == self.color:
+        for nextMove in logic.ray_from(current, (0, offset)):
+            square = boardMap.get(nextMove)
+            if square.isOccupied:
+                if square.piece.color == self.color:
                     break
                 moves.append(nextMove)
                 break
             moves.append(nextMove)
-            nextMove = logic.build(nextMove, 0, offset)
 
     def _getKnightsMove(self, moves, boardMap, current):
         """
         Method to append a position, type:`Location`, to given list. Based on
-        a knights movement.
+        a knights movement, looked up from the precomputed knight table.
 
         :param moves: type `list` moves appended to this object.
         :param boardMap: type `dict` Board.Map
         :param current: type `Location` Current Pieces square.
         """
-        choices = [2, -2, 1, -1]
-        for i in choices:
-            for j in choices:
-                if abs(j) == abs(i):
-                    continue
-
-                nextMove = logic.build(current, i, j)
-                try:
-                    square = boardMap.get(nextMove)
-                    if square.isOccupied and square.piece.color == self.color:
-                        raise ValueError("Same piece color")
-                    moves.append(nextMove)
-                except:
-                    continue
+        for target in KNIGHT_TARGETS[current.index]:
+            nextMove = Location.from_index(target)
+            square = boardMap.get(nextMove)
+            if square.isOccupied and square.piece.color == self.color:
+                continue
+            moves.append(nextMove)
 
     def update(self):
         self.rect.center = (
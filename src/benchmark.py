@@ -0,0 +1,311 @@
+"""
+Benchmarks for the headless core. Runs without pygame or a display.
+
+    python benchmark.py movegen --depth 3
+    python benchmark.py attacks --backends mailbox bitboard
+    python benchmark.py search --depth 3
+    python benchmark.py eval --repeat 2000
+    python benchmark.py batch --positions 5000
+    python benchmark.py nnue --network network.nnue
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from core.backends import BACKENDS, generator_for, new_position
+from core.evaluate import Evaluator, evaluate, evaluate_full
+from core.perft import perft
+from core.position import START_FEN
+from core.search import Search
+
+POSITIONS: Dict[str, str] = {
+    "start": START_FEN,
+    "kiwipete": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "endgame": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "middlegame": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+}
+
+# Search settings compared by bench_search, as keyword arguments to Search.
+# Each one switches a technique off, to be measured against the full search.
+SEARCH_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "full": {},
+    "no-ordering": {"ordering": False},
+    "no-staging": {"staged": False},
+    "no-quiescence": {"quiescence": False},
+    "no-null-move": {"null_move": False},
+    "no-lmr": {"lmr": False},
+    "no-pvs": {"pvs": False},
+    "no-aspiration": {"aspiration": False},
+    "no-selectivity": {"null_move": False, "lmr": False, "pvs": False, "aspiration": False},
+}
+
+
+def _timed(func: Callable[[], int]) -> Tuple[int, float]:
+    start = time.perf_counter()
+    count = func()
+    return count, time.perf_counter() - start
+
+
+def _report(title: str, rows: List[Tuple[str, int, float]]) -> None:
+    """Print one line per backend, with speed relative to the first row."""
+    print(title)
+    baseline = None
+    for name, count, seconds in rows:
+        rate = count / seconds if seconds else 0.0
+        baseline = baseline or rate
+        print(
+            f"  {name:<14} {count:>10} in {seconds:7.3f}s "
+            f"{rate:>12,.0f}/s  x{rate / baseline:.2f}"
+        )
+
+
+def bench_movegen(depth: int, backends: Iterable[str], track_attacks: bool = False) -> None:
+    """
+    Full legal move generation plus make/unmake over every position. With
+    `track_attacks`, each backend runs a second time keeping its attack maps
+    up to date incrementally.
+    """
+    rows = []
+    for backend in backends:
+        for tracked in (False, True) if track_attacks else (False,):
+            positions = [new_position(fen, backend) for fen in POSITIONS.values()]
+            for position in positions:
+                position.track_attacks(tracked)
+            nodes, seconds = _timed(lambda: sum(perft(pos, depth) for pos in positions))
+            rows.append((backend + ("+track" if tracked else ""), nodes, seconds))
+    _report(f"movegen depth {depth} (nodes)", rows)
+
+
+def bench_attacks(repeat: int, backends: Iterable[str]) -> None:
+    """Attack detection on every square, for both colours."""
+    rows = []
+    for backend in backends:
+        positions = [new_position(fen, backend) for fen in POSITIONS.values()]
+
+        def run() -> int:
+            queries = 0
+            for _ in range(repeat):
+                for position in positions:
+                    for square in range(64):
+                        position.is_square_attacked(square, 0)
+                        position.is_square_attacked(square, 1)
+                        queries += 2
+            return queries
+
+        queries, seconds = _timed(run)
+        rows.append((backend, queries, seconds))
+    _report(f"is_square_attacked x{repeat} (queries)", rows)
+
+
+def bench_search(depth: int, backends: Iterable[str], configs: Iterable[str]) -> None:
+    """
+    Time to depth: search every position to a fixed depth under each
+    setting, with node counts and time relative to the first setting.
+    """
+    for backend in backends:
+        print(f"search depth {depth} ({backend})")
+        baseline = None
+        for name in configs:
+            nodes = quiescence_nodes = cutoffs = first_move_cutoffs = 0
+            start = time.perf_counter()
+            for fen in POSITIONS.values():
+                search = Search(new_position(fen, backend), **SEARCH_CONFIGS[name])
+                search.run(depth)
+                nodes += search.nodes
+                quiescence_nodes += search.quiescence_nodes
+                cutoffs += search.cutoffs
+                first_move_cutoffs += search.first_move_cutoffs
+            seconds = time.perf_counter() - start
+            baseline = baseline or (nodes, seconds)
+            print(
+                f"  {name:<14} {nodes:>10} nodes x{nodes / baseline[0]:.2f} "
+                f"({quiescence_nodes} quiescence) "
+                f"in {seconds:7.3f}s x{seconds / baseline[1]:.2f} "
+                f"{nodes / seconds:>9,.0f}/s  "
+                f"first move cutoffs {first_move_cutoffs / max(cutoffs, 1):.1%}"
+            )
+
+
+def bench_eval(repeat: int, backends: Iterable[str]) -> None:
+    """
+    Leaf evaluation from the incremental terms against a full recompute,
+    and with pawn structure worked out every time or from the pawn hash.
+    """
+    for backend in backends:
+        positions = [new_position(fen, backend) for fen in POSITIONS.values()]
+        rows = []
+        evaluators = (
+            ("full", evaluate_full),
+            ("incremental", evaluate),
+            ("pawns", Evaluator(pawn_hash_mb=0)),
+            ("pawn hash", Evaluator()),
+        )
+        for name, func in evaluators:
+
+            def run() -> int:
+                for _ in range(repeat):
+                    for position in positions:
+                        func(position)
+                return repeat * len(positions)
+
+            count, seconds = _timed(run)
+            rows.append((name, count, seconds))
+        _report(f"evaluate x{repeat} ({backend}, evaluations)", rows)
+
+
+def playout_positions(count: int, backend: str, seed: int = 0) -> List[Any]:
+    """`count` distinct positions from random games out of every benchmark position."""
+    rng = random.Random(seed)
+    starts = list(POSITIONS.values())
+    positions = []
+    while len(positions) < count:
+        position = new_position(rng.choice(starts), backend)
+        for _ in range(rng.randrange(1, 60)):
+            moves = list(generator_for(position).generate_moves())
+            if not moves or len(positions) >= count:
+                break
+            position.make_move(rng.choice(moves))
+            positions.append(position.copy())
+    return positions
+
+
+def bench_batch(count: int, backends: Iterable[str]) -> None:
+    """
+    NumPy batch evaluation of many positions at once against the scalar
+    evaluator called on each in turn. Batch timings include encoding, but
+    for "encoded", which scores planes encoded beforehand.
+    """
+    from core.batch import encode_bitboards, encode_planes, evaluate_batch
+
+    for backend in backends:
+        positions = playout_positions(count, backend)
+        scalar, hashed = Evaluator(pawn_hash_mb=0), Evaluator()
+        encoded = encode_planes(positions)
+        rows = []
+        for name, func in (
+            ("scalar", lambda: [scalar(position) for position in positions]),
+            ("pawn hash", lambda: [hashed(position) for position in positions]),
+            ("batch", lambda: evaluate_batch(encode_planes(positions), mobility=False)),
+            ("encoded", lambda: evaluate_batch(encoded, mobility=False)),
+            ("batch bb", lambda: evaluate_batch(encode_bitboards(positions), mobility=False)),
+            ("batch mob", lambda: evaluate_batch(encode_planes(positions))),
+        ):
+            _, seconds = _timed(lambda: len(func()))
+            rows.append((name, len(positions), seconds))
+        _report(f"evaluate {len(positions)} positions ({backend}, evaluations)", rows)
+        batch = evaluate_batch(encoded, mobility=False)
+        agree = sum(int(score) == scalar(position) for score, position in zip(batch, positions))
+        print(f"  batch agrees with scalar on {agree}/{len(positions)}")
+
+
+def bench_nnue(path: str, count: int, depth: int, backends: Iterable[str]) -> None:
+    """
+    NNUE evaluation (see train_nnue.py) against the hand-crafted PeSTO one:
+    how far apart their scores are on random positions, and the nodes and
+    time each takes to search to a fixed depth, also with the network's
+    accumulators rebuilt at every node rather than updated move by move.
+    """
+    from core.nnue import Network, NNUEEvaluator
+
+    network = Network.load(path)
+    print(network)
+    # Not the seed train_nnue.py takes its positions from by default.
+    positions = playout_positions(count, "mailbox", seed=1)
+    nnue = NNUEEvaluator(network)
+    handcrafted = Evaluator()
+    pairs = [(handcrafted(position), nnue.full(position)) for position in positions]
+    errors = sorted(abs(expected - got) for expected, got in pairs)
+    decided = [(expected, got) for expected, got in pairs if abs(expected) >= 100]
+    agree = sum((expected > 0) == (got > 0) for expected, got in decided)
+    print(
+        f"  {len(pairs)} positions: mean error {sum(errors) / len(errors):.0f}cp, "
+        f"median {errors[len(errors) // 2]}cp, "
+        f"same side ahead in {agree}/{len(decided)} with 100cp or more in it"
+    )
+
+    evaluators = (
+        ("pesto", Evaluator),
+        ("nnue", lambda: NNUEEvaluator(network)),
+        ("nnue full", lambda: nnue.full),
+    )
+
+    def row(label: str, cells: Iterable[str]) -> None:
+        print(f"  {label:<11}" + "".join(f"{cell:>24}" for cell in cells))
+
+    for backend in backends:
+        print(f"search depth {depth} ({backend}): nodes and time to depth")
+        row("", (name for name, _ in evaluators))
+        totals = [(0, 0.0)] * len(evaluators)
+        for label, fen in POSITIONS.items():
+            results = []
+            for _, make in evaluators:
+                search = Search(new_position(fen, backend), evaluate=make())
+                results.append(_timed(lambda: search.run(depth).nodes))
+            row(label, (f"{nodes} {seconds:8.2f}s" for nodes, seconds in results))
+            totals = [
+                (nodes + more, seconds + longer)
+                for (nodes, seconds), (more, longer) in zip(totals, results)
+            ]
+        row("total", (f"{nodes} {seconds:8.2f}s" for nodes, seconds in totals))
+        nodes0, seconds0 = totals[0]
+        row("x pesto", (
+            f"x{nodes / nodes0:.2f} x{seconds / seconds0:.2f}" for nodes, seconds in totals
+        ))
+        row("nodes/s", (f"{nodes / seconds:,.0f}" for nodes, seconds in totals))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    # On every subcommand, after its name, so the list can't swallow it.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS)
+    )
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    movegen = sub.add_parser("movegen", parents=[common], help=bench_movegen.__doc__)
+    movegen.add_argument("--depth", type=int, default=3)
+    movegen.add_argument(
+        "--track-attacks", action="store_true", help="also time incremental attack maps"
+    )
+
+    attacks = sub.add_parser("attacks", parents=[common], help=bench_attacks.__doc__)
+    attacks.add_argument("--repeat", type=int, default=50)
+
+    search = sub.add_parser("search", parents=[common], help=bench_search.__doc__)
+    search.add_argument("--depth", type=int, default=3)
+    search.add_argument(
+        "--configs", nargs="+", default=list(SEARCH_CONFIGS), choices=list(SEARCH_CONFIGS)
+    )
+
+    evaluation = sub.add_parser("eval", parents=[common], help=bench_eval.__doc__)
+    evaluation.add_argument("--repeat", type=int, default=2000)
+
+    batch = sub.add_parser("batch", parents=[common], help=bench_batch.__doc__)
+    batch.add_argument("--positions", type=int, default=5000)
+
+    nnue = sub.add_parser("nnue", parents=[common], help=bench_nnue.__doc__)
+    nnue.add_argument("--network", default="network.nnue", help="file written by train_nnue.py")
+    nnue.add_argument("--positions", type=int, default=2000)
+    nnue.add_argument("--depth", type=int, default=3)
+
+    args = parser.parse_args(argv)
+    if args.bench == "movegen":
+        bench_movegen(args.depth, args.backends, args.track_attacks)
+    elif args.bench == "attacks":
+        bench_attacks(args.repeat, args.backends)
+    elif args.bench == "search":
+        bench_search(args.depth, args.backends, args.configs)
+    elif args.bench == "eval":
+        bench_eval(args.repeat, args.backends)
+    elif args.bench == "batch":
+        bench_batch(args.positions, args.backends)
+    elif args.bench == "nnue":
+        bench_nnue(args.network, args.positions, args.depth, args.backends)
+
+
+if __name__ == "__main__":
+    main()
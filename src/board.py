@@ -9,15 +9,20 @@ from typing import (
 )
 import pygame
 
-import logic
 import constants as c
 from location import Location
 from squares import Square
 from fen import PositionInfo, START_FEN, load_from_fen
+from core.position import Position
+from core.backends import DEFAULT_BACKEND, new_position
+from core.constants import enum_from_color, WHITE
+from core.move import CASTLE, move_flag, move_from, move_to
+from move import Flag, UndoRecord
+from Pieces import Pawn
 
 if TYPE_CHECKING:
     from abstract_piece import AbstractPiece
-    from Pieces import Pawn, Rook, Queen, King, Bishop
+    from Pieces import Rook, Queen, King, Bishop
     from squares import Square
     from move import Move
 
@@ -29,6 +34,9 @@ SpriteGroup = Iterable[pygame.sprite.Sprite]
 class Board(pygame.sprite.Group):
     """
     Representation of Chess Board. Manage piece movement and board display.
+    The rules live in the headless `core.Position` held on board.position,
+    the board's squares and piece sprites are a view kept in step with it.
+
     board.map attribute is a dictionary pairing each instance of Location, to
     an instance of a square. This allows us to quickly access information on a
     square by it's given location.
@@ -58,13 +66,26 @@ class Board(pygame.sprite.Group):
             c.Color.DARK: self._dark_pieces,
             c.Color.LIGHT: self._light_pieces,
         }
+        self.position: Position
+        self.undo_stack: List[UndoRecord] = []
         self.white_to_move: bool
         self.color_to_move: c.Color
 
-    def init(self, load_position: PositionInfo = start_position):
-        """Initalises board inline."""
-        self.white_to_move = load_position.whiteToMove
-        self.color_to_move = c.Color.LIGHT if self.white_to_move else c.Color.DARK
+    def init(
+        self,
+        load_position: PositionInfo = start_position,
+        backend: str = DEFAULT_BACKEND,
+    ):
+        """
+        Initalises board inline.
+
+        :param backend: name of the `core.backends` position representation
+                        the rules run on, ie. "mailbox" or "bitboard".
+        """
+        self.position = new_position(load_position.fen, backend)
+        self.undo_stack = []
+        self.white_to_move = self.position.side == WHITE
+        self.color_to_move = enum_from_color(self.position.side)
 
         pieces = load_position.squares
         _map = {}
@@ -80,8 +101,6 @@ class Board(pygame.sprite.Group):
                 # Add square to the drawable pieces.
                 self.board_squares.add(square)
 
-                pos.square = square
-
                 if piece := pieces.get(pos):
 
                     square.piece = piece
@@ -110,8 +129,62 @@ class Board(pygame.sprite.Group):
         return f"<{self.__class__.__name__} {inners}>"
 
     def make_move(self, move: Move):
+        """
+        Play a move from the `MoveGenerator` on the position, then move the
+        sprites to match. An `UndoRecord` is pushed so `unmake_move` can take
+        it back.
+        """
+        piece = move.moved_piece
+        if move.flag == Flag.ENPASSANT:
+            captured_square = move.enpassented_square
+        else:
+            captured_square = move.to_sq
+        self.undo_stack.append(
+            UndoRecord(
+                move,
+                captured_square.piece,
+                captured_square,
+                piece.isFirstMove,
+                getattr(piece, "enpassant_able", False),
+            )
+        )
+        self.position.make_move(move.core_move)
         move.perform(self)
 
+    def unmake_move(self) -> Move:
+        """Take back the last move played with `make_move`, returning it."""
+        record = self.undo_stack.pop()
+        move = record.move
+        self.position.unmake_move()
+
+        piece = move.moved_piece
+        if move.flag == Flag.PROMOTE:
+            # Promotion turned the pawn sprite into another piece in place.
+            Pawn.promote(piece, Pawn)
+        move.to_sq.clear()
+        piece.square = move.from_sq
+        piece.isFirstMove = record.first_move
+        if isinstance(piece, Pawn):
+            piece.enpassant_able = record.enpassant_able
+
+        core_move = move.core_move
+        if move_flag(core_move) == CASTLE:
+            king_to = move_to(core_move)
+            if king_to > move_from(core_move):
+                rook_from, rook_to = king_to + 1, king_to - 1
+            else:
+                rook_from, rook_to = king_to - 2, king_to + 1
+            rook_square = self.get(Location.from_index(rook_to))
+            rook = rook_square.piece
+            rook_square.clear()
+            rook.square = self.get(Location.from_index(rook_from))
+            rook.isFirstMove = True
+
+        if captured := record.captured:
+            captured.alive = True
+            self.set_piece(captured, record.captured_square)
+        return move
+
     def get(self, location: Location) -> Square:
         """Return square from board at given location"""
         return self.map[location]
@@ -199,6 +272,11 @@ class Board(pygame.sprite.Group):
     def map(self) -> Mapping[Location, Square]:
         return self._map
 
+    @property
+    def key(self) -> int:
+        """Zobrist key of the current position, see `core.zobrist`."""
+        return self.position.key
+
     @property
     def light_pieces(self):
         return self._light_pieces
@@ -227,4 +305,5 @@ class Board(pygame.sprite.Group):
     def end_turn(self):
         self.deselect()
         self.reset_squares()
-        self.color_to_move = logic.switch_turn(self.color_to_move)
+        self.white_to_move = self.position.side == WHITE
+        self.color_to_move = enum_from_color(self.position.side)
@@ -1,8 +1,9 @@
 import os
-from enum import Enum
 
 import pygame
 
+from core.constants import DIMENSIONS, RANKS, Files, Color
+
 __all__ = (
     "ROOT_DIR",
     "WIDTH",
@@ -18,25 +19,7 @@ ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 print(ROOT_DIR)
 WIDTH = HEIGHT = 512
 FPS = 60
-DIMENSIONS = 8
 SQ_SIZE = HEIGHT // DIMENSIONS
-RANKS = [8, 7, 6, 5, 4, 3, 2, 1]
-
-
-class Files(Enum):
-    A = 1
-    B = 2
-    C = 3
-    D = 4
-    E = 5
-    F = 6
-    G = 7
-    H = 8
-
-
-class Color(Enum):
-    LIGHT = 1
-    DARK = 2
 
 
 def _setup_images(path, pieces=None):
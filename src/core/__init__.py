@@ -0,0 +1,11 @@
+"""
+Headless chess rules. Nothing in this package imports pygame, so engines,
+servers and batch jobs can use the rules without a display.
+"""
+from .constants import *
+from .location import Location
+from .move import Move
+from .position import Position, START_FEN
+from .movegen import MoveGenerator
+from .bitboard import BitboardPosition, BitboardMoveGenerator
+from .backends import BACKENDS, DEFAULT_BACKEND, new_position, generator_for, backend_name
@@ -0,0 +1,147 @@
+"""
+Attack maps: every square one colour attacks.
+
+A map is built for the position as it stands and is shared by everything
+asking about it (king move legality, castling through check, highlighting)
+through :meth:`core.position.Position.attacks`, which only rebuilds it once
+the position's key has changed.
+
+The defending king is lifted off the board while the map is built, so a
+slider's attack carries on through it. That is what king moves need, a king
+can't step back along the ray that checks it.
+
+A position can also keep its attacks up to date move by move with an
+:class:`AttackTracker`, see :meth:`core.position.Position.track_attacks`.
+Each time a piece is put down or lifted, only its own attacks change, along
+with those of the sliders whose rays reach its square, so a map is the
+union of the stored attacks. Tracking is off by default: building a map
+from scratch costs less than keeping the tracker up to date on every make
+and unmake (`benchmark.py movegen --track-attacks`). Its debug mode checks
+it against a full recompute after every make and unmake.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List
+
+from .constants import BISHOP, ROOK, QUEEN
+from .sliders import rook_attacks, bishop_attacks, queen_attacks
+from .tables import iter_bits
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = ("AttackMap", "AttackTracker")
+
+
+class AttackMap:
+    """Squares attacked by `color` in a position, as a bitboard."""
+
+    __slots__ = ("position", "color", "key", "occupied", "squares")
+
+    def __init__(self, position: Position, color: int) -> None:
+        self.position = position
+        self.color = color
+        self.key = position.key
+        king_square = position.king_squares[color ^ 1]
+        occupied = position.occupied
+        if king_square >= 0:
+            occupied &= ~(1 << king_square)
+        self.occupied = occupied
+        tracker = position.tracker
+        if tracker is None:
+            self.squares = position.attack_map(color, occupied)
+            return
+        squares = tracker.attacked(color)
+        if king_square >= 0:
+            # Tracked sliders stop at the king, the map needs them through it.
+            for square in tracker.sliders_reaching(king_square, color):
+                squares |= position.piece_attacks(square, occupied)
+        self.squares = squares
+
+    def __contains__(self, square: int) -> bool:
+        return bool(self.squares >> square & 1)
+
+    def __repr__(self) -> str:
+        squares = bin(self.squares).count("1")
+        return f"<{self.__class__.__name__} color={self.color} squares={squares}>"
+
+
+class AttackTracker:
+    """
+    The squares each piece of a position attacks, updated by the position's
+    `_put` and `_remove` as pieces move. A colour's attacked squares are the
+    union of its pieces'.
+    """
+
+    __slots__ = ("position", "debug", "piece_attacks")
+
+    def __init__(self, position: Position, debug: bool = False) -> None:
+        self.position = position
+        self.debug = debug
+        self.piece_attacks = [0] * 64
+        for square in iter_bits(position.occupied):
+            self.piece_attacks[square] = position.piece_attacks(square)
+
+    def attacked(self, color: int) -> int:
+        """Bitboard of every square attacked by `color`."""
+        piece_attacks = self.piece_attacks
+        squares = 0
+        for square in iter_bits(self.position.occupancy[color]):
+            squares |= piece_attacks[square]
+        return squares
+
+    def sliders_reaching(self, square: int, color: int) -> Iterator[int]:
+        """Yield the sliders of `color` with a ray stopping on `square`."""
+        position = self.position
+        board = position.board
+        occupied = position.occupied
+        pieces = position.occupancy[color]
+        for slider in iter_bits(rook_attacks(square, occupied) & pieces):
+            if board[slider] & 7 in (ROOK, QUEEN):
+                yield slider
+        for slider in iter_bits(bishop_attacks(square, occupied) & pieces):
+            if board[slider] & 7 in (BISHOP, QUEEN):
+                yield slider
+
+    def _refresh_sliders(self, square: int) -> None:
+        """Recompute the sliders whose rays reach a square that changed."""
+        position = self.position
+        board = position.board
+        occupied = position.occupied
+        piece_attacks = self.piece_attacks
+        for slider in iter_bits(rook_attacks(square, occupied) & occupied):
+            kind = board[slider] & 7
+            if kind == ROOK:
+                piece_attacks[slider] = rook_attacks(slider, occupied)
+            elif kind == QUEEN:
+                piece_attacks[slider] = queen_attacks(slider, occupied)
+        for slider in iter_bits(bishop_attacks(square, occupied) & occupied):
+            kind = board[slider] & 7
+            if kind == BISHOP:
+                piece_attacks[slider] = bishop_attacks(slider, occupied)
+            elif kind == QUEEN:
+                piece_attacks[slider] = queen_attacks(slider, occupied)
+
+    def put(self, square: int, piece: int) -> None:
+        """Called once `piece` has been put on the empty `square`."""
+        self._refresh_sliders(square)
+        self.piece_attacks[square] = self.position.piece_attacks(square)
+
+    def remove(self, square: int, piece: int) -> None:
+        """Called once `piece` has been lifted from `square`."""
+        self.piece_attacks[square] = 0
+        self._refresh_sliders(square)
+
+    def verify(self) -> None:
+        """
+        Raise AssertionError unless every piece's tracked attacks, and each
+        colour's attacked squares, match a recompute from the board.
+        """
+        position = self.position
+        expected: List[int] = [0] * 64
+        for square in iter_bits(position.occupied):
+            expected[square] = position.piece_attacks(square)
+        if self.piece_attacks != expected or any(
+            self.attacked(color) != position.attack_map(color) for color in (0, 1)
+        ):
+            raise AssertionError(f"Tracked attacks out of step with {position.fen()!r}")
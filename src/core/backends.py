@@ -0,0 +1,47 @@
+"""
+Position backends. A backend is a :class:`Position` class paired with the
+:class:`MoveGenerator` that knows how to read it.
+
+    position = new_position(START_FEN, backend="bitboard")
+    moves = generator_for(position).generate_moves()
+"""
+from __future__ import annotations
+
+from typing import Dict, Tuple, Type
+
+from .bitboard import BitboardPosition, BitboardMoveGenerator
+from .movegen import MoveGenerator
+from .position import Position, START_FEN
+
+__all__ = ("BACKENDS", "DEFAULT_BACKEND", "new_position", "generator_for", "backend_name")
+
+BACKENDS: Dict[str, Tuple[Type[Position], Type[MoveGenerator]]] = {
+    "mailbox": (Position, MoveGenerator),
+    "bitboard": (BitboardPosition, BitboardMoveGenerator),
+}
+DEFAULT_BACKEND = "mailbox"
+
+
+def new_position(fen: str = START_FEN, backend: str = DEFAULT_BACKEND) -> Position:
+    """Build a position from FEN using the named backend."""
+    try:
+        position_class, _ = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown position backend {backend!r}") from None
+    return position_class.from_fen(fen)
+
+
+def generator_for(position: Position) -> MoveGenerator:
+    """Return a move generator matching the position's backend."""
+    for position_class, generator_class in reversed(list(BACKENDS.values())):
+        if isinstance(position, position_class):
+            return generator_class(position)
+    raise TypeError(f"No move generator for {type(position).__name__}")
+
+
+def backend_name(position: Position) -> str:
+    """Name of the backend a position belongs to, for rebuilding it elsewhere."""
+    for name, (position_class, _) in reversed(list(BACKENDS.items())):
+        if isinstance(position, position_class):
+            return name
+    raise TypeError(f"No backend for {type(position).__name__}")
@@ -0,0 +1,202 @@
+"""
+Bitboard position backend.
+
+Each of the twelve (colour, piece type) pairs gets a 64-bit integer with one
+bit set per occupied square, using the same square indexes as the mailbox
+(a1 = bit 0, h8 = bit 63). Per colour occupancy and total occupancy sets are
+kept alongside, so attack detection and move generation become a handful of
+integer operations instead of walking the board list square by square.
+
+The mailbox list is still maintained underneath, so `piece_at` stays a single
+index and everything built on :class:`Position` keeps working unchanged.
+"""
+from __future__ import annotations
+
+from typing import List
+
+from .constants import (
+    WHITE,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+)
+from .move import NORMAL, DOUBLE_PUSH, EN_PASSANT
+from .movegen import MoveGenerator
+from .position import Position
+from .sliders import rook_attacks, bishop_attacks
+from .tables import (
+    MASK64,
+    iter_bits,
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    PAWN_ATTACKS,
+)
+
+__all__ = (
+    "BitboardPosition",
+    "BitboardMoveGenerator",
+    "bitboard_index",
+    "iter_bits",
+    "MASK64",
+)
+
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+NOT_A_FILE = ~0x0101010101010101 & MASK64
+NOT_H_FILE = ~0x8080808080808080 & MASK64
+
+
+def bitboard_index(color: int, kind: int) -> int:
+    """Index into BitboardPosition.bitboards for a colour and piece type."""
+    return color * 6 + kind - 1
+
+
+class BitboardPosition(Position):
+    """:class:`Position` that also keeps twelve piece bitboards."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.bitboards: List[int] = [0] * 12
+
+    def _put(self, square: int, piece: int) -> None:
+        super()._put(square, piece)
+        self.bitboards[(piece >> 3) * 6 + (piece & 7) - 1] |= 1 << square
+
+    def _remove(self, square: int) -> int:
+        piece = super()._remove(square)
+        if piece:
+            self.bitboards[(piece >> 3) * 6 + (piece & 7) - 1] &= ~(1 << square)
+        return piece
+
+    def pieces_of(self, color: int, kind: int) -> int:
+        return self.bitboards[color * 6 + kind - 1]
+
+    def has_non_pawn_material(self, color: int) -> bool:
+        bitboards = self.bitboards
+        base = color * 6 - 1
+        return bool(
+            bitboards[base + KNIGHT]
+            | bitboards[base + BISHOP]
+            | bitboards[base + ROOK]
+            | bitboards[base + QUEEN]
+        )
+
+    def attackers_to(self, square: int, by_color: int, occupied: int = -1) -> int:
+        """Bitboard of `by_color` pieces attacking the square."""
+        if occupied < 0:
+            occupied = self.occupied
+        bitboards = self.bitboards
+        base = by_color * 6 - 1
+        queens = bitboards[base + QUEEN]
+        return (
+            (PAWN_ATTACKS[by_color ^ 1][square] & bitboards[base + PAWN])
+            | (KNIGHT_ATTACKS[square] & bitboards[base + KNIGHT])
+            | (KING_ATTACKS[square] & bitboards[base + KING])
+            | (bishop_attacks(square, occupied) & (bitboards[base + BISHOP] | queens))
+            | (rook_attacks(square, occupied) & (bitboards[base + ROOK] | queens))
+        )
+
+    def is_square_attacked(self, square: int, by_color: int) -> bool:
+        return bool(self.attackers_to(square, by_color))
+
+    def attack_map(self, color: int, occupied: int = -1) -> int:
+        if occupied < 0:
+            occupied = self.occupied
+        bitboards = self.bitboards
+        base = color * 6 - 1
+        pawns = bitboards[base + PAWN]
+        if color == WHITE:
+            attacks = ((pawns & NOT_A_FILE) << 7) | ((pawns & NOT_H_FILE) << 9)
+        else:
+            attacks = ((pawns & NOT_A_FILE) >> 9) | ((pawns & NOT_H_FILE) >> 7)
+        attacks &= MASK64
+        for square in iter_bits(bitboards[base + KNIGHT]):
+            attacks |= KNIGHT_ATTACKS[square]
+        for square in iter_bits(bitboards[base + KING]):
+            attacks |= KING_ATTACKS[square]
+        queens = bitboards[base + QUEEN]
+        for square in iter_bits(bitboards[base + BISHOP] | queens):
+            attacks |= bishop_attacks(square, occupied)
+        for square in iter_bits(bitboards[base + ROOK] | queens):
+            attacks |= rook_attacks(square, occupied)
+        return attacks
+
+
+class BitboardMoveGenerator(MoveGenerator):
+    """
+    :class:`MoveGenerator` for a :class:`BitboardPosition`. Same plan and same
+    public attributes, but pieces are found through their bitboards and
+    knights, sliders and pawns are generated a whole set at a time.
+    """
+
+    position: BitboardPosition
+
+    def opponent_pieces(self, candidates: int, kind: int) -> int:
+        bitboards = self.position.bitboards
+        base = self.opponent_colour * 6 - 1
+        pieces = bitboards[base + kind]
+        if kind == ROOK or kind == BISHOP:
+            pieces |= bitboards[base + QUEEN]
+        return candidates & pieces
+
+    def generate_piece_moves(self) -> None:
+        position = self.position
+        bitboards = position.bitboards
+        friendly = self.friendly_colour
+        targets = ~position.occupancy[friendly] & self.target_mask
+        occupied = position.occupied
+        pinned = self.pinned
+        base = friendly * 6 - 1
+        moves = self.moves
+
+        for square in iter_bits(bitboards[base + KNIGHT] & ~pinned):
+            for target in iter_bits(KNIGHT_ATTACKS[square] & targets):
+                moves.append(square | target << 6)
+
+        queens = bitboards[base + QUEEN]
+        for pieces, attack_function in (
+            (bitboards[base + BISHOP] | queens, bishop_attacks),
+            (bitboards[base + ROOK] | queens, rook_attacks),
+        ):
+            for square in iter_bits(pieces):
+                attacks = attack_function(square, occupied) & targets
+                if pinned >> square & 1:
+                    attacks &= self.pin_lines[square]
+                for target in iter_bits(attacks):
+                    moves.append(square | target << 6)
+
+        self.get_pawn_moves_set(bitboards[base + PAWN])
+
+    def get_pawn_moves_set(self, pawns: int) -> None:
+        """Generate pawn moves for every pawn at once with shifted bitboards."""
+        position = self.position
+        empty = ~position.occupied & MASK64
+        enemy = position.occupancy[self.opponent_colour]
+        if position.ep_square is not None:
+            enemy |= 1 << position.ep_square
+
+        if self.friendly_colour == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & RANK_3) << 8) & empty
+            push, left, right = 8, 7, 9
+            captures_left = ((pawns & NOT_A_FILE) << 7) & enemy
+            captures_right = ((pawns & NOT_H_FILE) << 9) & enemy
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & RANK_6) >> 8) & empty
+            push, left, right = -8, -9, -7
+            captures_left = ((pawns & NOT_A_FILE) >> 9) & enemy
+            captures_right = ((pawns & NOT_H_FILE) >> 7) & enemy
+
+        mask = self.pawn_mask
+        for target in iter_bits(single & mask):
+            self.add_pawn_move(target - push, target, NORMAL)
+        for target in iter_bits(double & mask):
+            self.add_pawn_move(target - 2 * push, target, DOUBLE_PUSH)
+        for captures, shift in ((captures_left, left), (captures_right, right)):
+            for target in iter_bits(captures & mask):
+                flag = EN_PASSANT if target == position.ep_square else NORMAL
+                self.add_pawn_move(target - shift, target, flag)
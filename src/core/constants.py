@@ -0,0 +1,140 @@
+"""
+Pure-data constants shared by the headless rules and the pygame view.
+
+Nothing in here may import pygame. Squares are plain integers in the range
+0-63 with a1 = 0, b1 = 1, ... h8 = 63, and pieces are small integers packing
+a colour and a piece type together.
+"""
+from enum import Enum
+
+__all__ = (
+    "DIMENSIONS",
+    "RANKS",
+    "Files",
+    "Color",
+    "WHITE",
+    "BLACK",
+    "EMPTY",
+    "PAWN",
+    "KNIGHT",
+    "BISHOP",
+    "ROOK",
+    "QUEEN",
+    "KING",
+    "PIECE_NAMES",
+    "PIECE_SYMBOLS",
+    "WHITE_KINGSIDE",
+    "WHITE_QUEENSIDE",
+    "BLACK_KINGSIDE",
+    "BLACK_QUEENSIDE",
+    "make_piece",
+    "piece_color",
+    "piece_type",
+    "square_of",
+    "file_of",
+    "rank_of",
+    "square_name",
+    "parse_square",
+    "color_from_enum",
+    "enum_from_color",
+)
+
+DIMENSIONS = 8
+RANKS = [8, 7, 6, 5, 4, 3, 2, 1]
+
+
+class Files(Enum):
+    A = 1
+    B = 2
+    C = 3
+    D = 4
+    E = 5
+    F = 6
+    G = 7
+    H = 8
+
+
+class Color(Enum):
+    LIGHT = 1
+    DARK = 2
+
+
+# Colours as used by the core. Indexable, so per-colour data lives in lists.
+WHITE = 0
+BLACK = 1
+
+# Piece types. A piece is ``type | (colour << 3)`` and an empty square is 0.
+EMPTY = 0
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+
+PIECE_NAMES = {
+    PAWN: "pawn",
+    KNIGHT: "knight",
+    BISHOP: "bishop",
+    ROOK: "rook",
+    QUEEN: "queen",
+    KING: "king",
+}
+
+PIECE_SYMBOLS = {
+    PAWN: "p",
+    KNIGHT: "n",
+    BISHOP: "b",
+    ROOK: "r",
+    QUEEN: "q",
+    KING: "k",
+}
+
+# Castling rights bit flags.
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+
+
+def make_piece(color: int, kind: int) -> int:
+    return kind | (color << 3)
+
+
+def piece_color(piece: int) -> int:
+    return piece >> 3
+
+
+def piece_type(piece: int) -> int:
+    return piece & 7
+
+
+def square_of(file: int, rank: int) -> int:
+    """Square index from a 1-8 file and a 1-8 rank."""
+    return (rank - 1) * 8 + (file - 1)
+
+
+def file_of(square: int) -> int:
+    """1-8 file of a square index."""
+    return (square & 7) + 1
+
+
+def rank_of(square: int) -> int:
+    """1-8 rank of a square index."""
+    return (square >> 3) + 1
+
+
+def square_name(square: int) -> str:
+    return "abcdefgh"[square & 7] + str((square >> 3) + 1)
+
+
+def parse_square(name: str) -> int:
+    return square_of("abcdefgh".index(name[0]) + 1, int(name[1]))
+
+
+def color_from_enum(color: Color) -> int:
+    return WHITE if color == Color.LIGHT else BLACK
+
+
+def enum_from_color(color: int) -> Color:
+    return Color.LIGHT if color == WHITE else Color.DARK
@@ -0,0 +1,96 @@
+"""
+Static evaluation for search.
+
+Scores are in centipawns from the point of view of the side to move, which
+is what negamax wants: a position good for white scores positive with white
+to move and negative with black to move.
+
+The evaluation is tapered: material plus piece-square tables (see
+`core.pst`) give one score for the middlegame and one for the endgame, and
+the game phase, counted from the pieces still on the board, blends them.
+The position keeps both scores and the phase up to date on every make and
+unmake, so :func:`evaluate` does no more than the blend.
+:func:`evaluate_full` works them out from the board instead, to check the
+incremental ones against.
+
+An :class:`Evaluator` adds pawn structure and king shelter on top, looked
+up in its own :class:`core.pawns.PawnHash`, so it is what search uses.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+from .constants import WHITE, BLACK, PAWN
+from .pawns import PawnHash, pawn_structure
+from .pst import MAX_PHASE, compute_scores
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = ("PIECE_VALUES", "Evaluator", "evaluate", "evaluate_full", "taper")
+
+DEFAULT_PAWN_HASH_MB = 1
+
+# Plain material, indexed by piece type, for deciding which captures are
+# worth a look. The king is never traded so it counts for nothing.
+PIECE_VALUES: Tuple[int, ...] = (0, 100, 320, 330, 500, 900, 0)
+
+
+def taper(mg: int, eg: int, phase: int) -> int:
+    """Blend middlegame and endgame scores, for white, by the game phase."""
+    phase = min(phase, MAX_PHASE)
+    return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+def evaluate(position: Position) -> int:
+    """Tapered score for the side to move, from the incremental terms."""
+    score = taper(position.mg_score, position.eg_score, position.phase)
+    return score if position.side == WHITE else -score
+
+
+def evaluate_full(position: Position) -> int:
+    """Same as :func:`evaluate`, recomputed from every piece on the board."""
+    score = taper(*compute_scores(position))
+    return score if position.side == WHITE else -score
+
+
+class Evaluator:
+    """
+    Tapered piece-square evaluation plus pawn structure, called like
+    :func:`evaluate`. Pawn terms come from a pawn hash of `pawn_hash_mb`
+    megabytes, or are worked out every time with 0.
+    """
+
+    def __init__(self, pawn_hash_mb: float = DEFAULT_PAWN_HASH_MB) -> None:
+        self.pawn_hash = PawnHash(pawn_hash_mb) if pawn_hash_mb else None
+
+    def __call__(self, position: Position) -> int:
+        pawn_hash = self.pawn_hash
+        white_king, black_king = position.king_squares
+        if pawn_hash is None:
+            pawn_mg, pawn_eg, _, shelter = pawn_structure(
+                (position.pieces_of(WHITE, PAWN), position.pieces_of(BLACK, PAWN))
+            )
+            pawn_mg += shelter[white_king & 7] - shelter[8 + (black_king & 7)]
+        else:
+            index = pawn_hash.probe(position)
+            shelter = pawn_hash.shelter
+            pawn_mg = (
+                pawn_hash.mg[index]
+                + shelter[16 * index + (white_king & 7)]
+                - shelter[16 * index + 8 + (black_king & 7)]
+            )
+            pawn_eg = pawn_hash.eg[index]
+        score = taper(position.mg_score + pawn_mg, position.eg_score + pawn_eg, position.phase)
+        return score if position.side == WHITE else -score
+
+    def full(self, position: Position) -> int:
+        """The same score, with every term recomputed from the board."""
+        mg, eg, phase = compute_scores(position)
+        pawn_mg, pawn_eg, _, shelter = pawn_structure(
+            (position.pieces_of(WHITE, PAWN), position.pieces_of(BLACK, PAWN))
+        )
+        white_king, black_king = position.king_squares
+        mg += pawn_mg + shelter[white_king & 7] - shelter[8 + (black_king & 7)]
+        score = taper(mg, eg + pawn_eg, phase)
+        return score if position.side == WHITE else -score
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from enum import Enum
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+from . import constants as c
+from .tables import ray
+
+__all__ = ("Location", "DIRECTIONS")
+
+Direction = Tuple[int, int]
+
+DIRECTIONS: Tuple[Direction, ...] = (
+    (0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (1, -1), (-1, -1), (-1, 1)
+)
+
+
+class Location:
+    """
+    Base Location class.
+
+    There is exactly one Location per square. They are created once at
+    import and handed back by the constructor, so `Location(Files.E, 4)`
+    never allocates and two locations are equal only when they are the
+    same object.
+    """
+
+    __slots__ = ("_file", "_rank", "_index")
+
+    def __new__(cls, file: Enum, rank: int) -> Location:
+        if not isinstance(file, Enum):
+            raise ValueError("Please pass file arg as Files. Enum")
+        if not 1 <= rank <= 8:
+            raise ValueError(f"Rank {rank!r} is off the board")
+        return _LOCATIONS[c.square_of(file.value, rank)]
+
+    @classmethod
+    def _create(cls, index: int) -> Location:
+        location = object.__new__(cls)
+        location._file = c.Files(c.file_of(index))
+        location._rank = c.rank_of(index)
+        location._index = index
+        return location
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(FILE={self._file.name}, " f"RANK={self._rank})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compare with Location.
+        :param other: Instance of :class:`Location`
+        """
+        return self is other
+
+    def __hash__(self):
+        """Compute hash for location"""
+        return self._index
+
+    def __reduce__(self):
+        # Copies and unpickled locations resolve back to the shared instance.
+        return Location.from_index, (self._index,)
+
+    @classmethod
+    def from_index(cls, index: int) -> Location:
+        """Location for a core square index (a1 = 0, h8 = 63)."""
+        return _LOCATIONS[index]
+
+    @property
+    def index(self) -> int:
+        """Core square index of this location."""
+        return self._index
+
+    @property
+    def file(self) -> Enum:
+        return self._file
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    def offset(self, file_offset: int, rank_offset: int) -> Optional[Location]:
+        """Location reached by a file and rank offset, or None off the board."""
+        file = (self._index & 7) + file_offset
+        rank = (self._index >> 3) + rank_offset
+        if 0 <= file < 8 and 0 <= rank < 8:
+            return _LOCATIONS[rank * 8 + file]
+        return None
+
+    def ray(self, direction: Direction) -> Tuple[Location, ...]:
+        """
+        Locations from here to the edge of the board in one of the eight
+        `DIRECTIONS`, not including this one. Rays are built once and shared.
+        """
+        return _RAYS[direction][self._index]
+
+
+_LOCATIONS: List[Location] = [Location._create(index) for index in range(64)]
+
+
+_RAYS: Dict[Direction, List[Tuple[Location, ...]]] = {
+    direction: [
+        tuple(_LOCATIONS[target] for target in ray(index, direction)) for index in range(64)
+    ]
+    for direction in DIRECTIONS
+}
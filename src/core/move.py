@@ -0,0 +1,120 @@
+"""
+Core move representation. Holds nothing but square indexes and a flag, so a
+move can be generated, compared and played without touching any sprites.
+
+Inside the engine a move is a plain 16-bit integer, which fits an
+`array('H')` slot:
+
+    bits  0-5   from square
+    bits  6-11  to square
+    bits 12-14  flag, PROMOTION + (piece - KNIGHT) for promotions
+
+:class:`Move` objects are only built when something wants to read or print a
+move, through :meth:`Move.from_code`.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from .constants import KNIGHT, PIECE_SYMBOLS, square_name, parse_square
+
+__all__ = (
+    "Move",
+    "NORMAL",
+    "DOUBLE_PUSH",
+    "CASTLE",
+    "EN_PASSANT",
+    "PROMOTION",
+    "encode_move",
+    "move_from",
+    "move_to",
+    "move_flag",
+    "move_promotion",
+)
+
+# Move flags.
+NORMAL = 0
+DOUBLE_PUSH = 1
+CASTLE = 2
+EN_PASSANT = 3
+PROMOTION = 4
+
+_PROMOTION_FROM_SYMBOL = {symbol: kind for kind, symbol in PIECE_SYMBOLS.items()}
+
+
+def encode_move(from_sq: int, to_sq: int, flag: int = NORMAL, promotion: int = 0) -> int:
+    """Pack a move into 16 bits."""
+    if promotion:
+        flag = PROMOTION + promotion - KNIGHT
+    return from_sq | to_sq << 6 | flag << 12
+
+
+def move_from(move: int) -> int:
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    return move >> 6 & 63
+
+
+def move_flag(move: int) -> int:
+    """Flag of an encoded move, every promotion gives PROMOTION."""
+    return min(move >> 12, PROMOTION)
+
+
+def move_promotion(move: int) -> int:
+    """Piece type promoted to, or 0."""
+    flag = move >> 12
+    return flag - PROMOTION + KNIGHT if flag >= PROMOTION else 0
+
+
+class Move:
+    """A single move between two square indexes."""
+
+    __slots__ = ("from_sq", "to_sq", "flag", "promotion")
+
+    def __init__(self, from_sq: int, to_sq: int, flag: int = NORMAL, promotion: int = 0):
+        self.from_sq = from_sq
+        self.to_sq = to_sq
+        self.flag = flag
+        self.promotion = promotion
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Move)
+            and other.from_sq == self.from_sq
+            and other.to_sq == self.to_sq
+            and other.promotion == self.promotion
+        )
+
+    def __hash__(self):
+        return hash((self.from_sq, self.to_sq, self.promotion))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.uci()}>"
+
+    @property
+    def code(self) -> int:
+        """The move as a 16-bit integer, see `encode_move`."""
+        return encode_move(self.from_sq, self.to_sq, self.flag, self.promotion)
+
+    @classmethod
+    def from_code(cls, code: int) -> Move:
+        """Build a Move from its 16-bit encoding."""
+        return cls(move_from(code), move_to(code), move_flag(code), move_promotion(code))
+
+    def uci(self) -> str:
+        """Move in long algebraic notation, ie. e2e4 or e7e8q"""
+        promotion = PIECE_SYMBOLS[self.promotion] if self.promotion else ""
+        return square_name(self.from_sq) + square_name(self.to_sq) + promotion
+
+    @classmethod
+    def from_uci(cls, text: str) -> Move:
+        """
+        Parse long algebraic notation. The returned move has no flag set, look
+        it up with `MoveGenerator.lookup` to get the fully flagged legal move.
+        """
+        promotion: Optional[int] = None
+        if len(text) == 5:
+            promotion = _PROMOTION_FROM_SYMBOL[text[4]]
+        return cls(parse_square(text[:2]), parse_square(text[2:4]), promotion=promotion or 0)
@@ -0,0 +1,425 @@
+"""
+Headless legal move generation.
+
+Follows the same plan as the GUI generator always has:
+    - calculate all attacks on the friendly king, including pins.
+    - calculate all possible king moves against the opponent's attack map.
+    - if in double check we just return King moves, as they're the only legal moves
+    - if not, generate all other moves, respecting pins.
+
+Sliding attacks, checks and pins all come from the lookup tables in
+`core.sliders`, so no ray is ever walked square by square. In single check,
+every piece but the king is limited to check_mask, the checking piece plus
+the squares between it and the king, so moves that ignore the check are never
+generated. En passant captures are the one exception, they are verified by
+making them on the position and looking at the king.
+
+Moves are 16-bit integers (see `core.move`) collected in an `array('H')` that
+each generator reuses from one call to the next, so generating a position's
+moves allocates no Move objects at all.
+
+Search asks for moves in stages instead, with
+:meth:`MoveGenerator.staged_moves`: a hash move, then captures, then
+promotions, then quiet moves, each stage sorted on its own. Each stage is
+only generated once the previous one has been used up, so a cutoff on an
+early move never pays for the quiet moves. Quiescence search wants nothing
+but the captures and promotions, and gets them from
+:meth:`MoveGenerator.generate_captures`.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .constants import (
+    WHITE,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE_KINGSIDE,
+    WHITE_QUEENSIDE,
+    BLACK_KINGSIDE,
+    BLACK_QUEENSIDE,
+)
+from .move import NORMAL, DOUBLE_PUSH, CASTLE, EN_PASSANT, PROMOTION, move_promotion
+from .sliders import (
+    BETWEEN,
+    rook_attacks,
+    bishop_attacks,
+    queen_attacks,
+    xray_rook_attacks,
+    xray_bishop_attacks,
+)
+from .tables import (
+    MASK64,
+    iter_bits,
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    PAWN_ATTACKS,
+    PAWN_TARGETS,
+)
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = ("MoveGenerator", "SLIDER_ATTACKS")
+
+SLIDER_ATTACKS = {
+    ROOK: rook_attacks,
+    BISHOP: bishop_attacks,
+    QUEEN: queen_attacks,
+}
+
+PROMOTION_PIECES = (QUEEN, ROOK, BISHOP, KNIGHT)
+PROMOTION_FLAGS = tuple((PROMOTION + kind - KNIGHT) << 12 for kind in PROMOTION_PIECES)
+PROMOTION_RANKS = 0xFF | (0xFF << 56)
+
+# (right, king from, king to, squares that must be empty, squares that must be safe)
+CASTLING = (
+    (WHITE_KINGSIDE, 4, 6, 0b1100000, 0b1100000),
+    (WHITE_QUEENSIDE, 4, 2, 0b1110, 0b1100),
+    (BLACK_KINGSIDE, 60, 62, 0b1100000 << 56, 0b1100000 << 56),
+    (BLACK_QUEENSIDE, 60, 58, 0b1110 << 56, 0b1100 << 56),
+)
+
+
+class MoveGenerator:
+    """Generates legal moves for the side to move of a :class:`Position`."""
+
+    def __init__(self, position: Position) -> None:
+        self.position = position
+        self.moves = array("H")
+        self.init()
+
+    def init(self) -> None:
+        del self.moves[:]
+        self._index: Optional[Dict[Tuple[int, int, int], int]] = None
+        self.in_check = False
+        self.in_double_check = False
+        self.checkers = 0
+        self.check_mask = MASK64
+        self.stage_mask = MASK64
+        self.target_mask = MASK64
+        self.pawn_mask = MASK64
+        self.castling_stage = True
+        self.pinned = 0
+        self.pin_lines: Dict[int, int] = {}
+        self.opponent_attack_map = 0
+        self.friendly_colour = self.position.side
+        self.opponent_colour = self.friendly_colour ^ 1
+
+    @property
+    def opponent_attacks(self) -> Set[int]:
+        """Set of squares attacked by the opponent."""
+        return set(iter_bits(self.opponent_attack_map))
+
+    def generate_moves(self) -> array:
+        """
+        Generate all the legal moves for the side to move. The returned array
+        is the instance's moves attribute, which is cleared and refilled by
+        the next call, so copy it if it has to outlive that.
+        """
+        self.init()
+        self.generate_attacks_on_king()
+        self.generate_opponent_attacks()
+        self.set_stage(MASK64, MASK64, True)
+        self.generate_king_moves()
+        if self.in_double_check:
+            return self.moves
+
+        self.generate_piece_moves()
+        return self.moves
+
+    def generate_captures(self) -> array:
+        """
+        Generate only the legal captures (en passant included) and
+        promotions, for quiescence search, so no quiet move is ever built.
+        The array is reused the same way as by generate_moves. Check
+        evasions are not completed: when in_check is set afterwards, use
+        generate_moves for every way out.
+        """
+        self.init()
+        self.generate_attacks_on_king()
+        self.generate_opponent_attacks()
+        position = self.position
+        empty = ~position.occupied & MASK64
+        ep_bit = 0 if position.ep_square is None else 1 << position.ep_square
+        enemy = position.occupancy[self.opponent_colour]
+        self.set_stage(enemy, enemy | ep_bit | empty & PROMOTION_RANKS, False)
+        self.generate_king_moves()
+        if not self.in_double_check:
+            self.generate_piece_moves()
+        return self.moves
+
+    def lookup(self, from_sq: int, to_sq: int, promotion: int = 0) -> int:
+        """
+        Legal move from the last generate_moves call matching the squares and
+        promotion piece, or 0 if there isn't one. Handy for validating moves
+        typed in or received as text, see `Move.from_uci`. The index behind
+        it is built on the first lookup, so plain generation doesn't pay.
+        """
+        index = self._index
+        if index is None:
+            index = self._index = {}
+            for move in self.moves:
+                index[(move & 63, move >> 6 & 63, move_promotion(move))] = move
+        return index.get((from_sq, to_sq, promotion), 0)
+
+    def staged_moves(
+        self,
+        hash_move: int = 0,
+        order: Optional[Callable[[Sequence[int]], List[int]]] = None,
+    ) -> Iterator[int]:
+        """
+        Yield the legal moves lazily: `hash_move` first if it is legal here,
+        then captures (including en passant and capturing promotions), then
+        the remaining promotions, then quiet moves and castling. A stage is
+        only generated once the consumer has taken every move of the one
+        before, and is put in `order` first when one is given. The position
+        must be back as it was whenever the next move is asked for.
+        """
+        self.init()
+        self.generate_attacks_on_king()
+        self.generate_opponent_attacks()
+        moves = self.moves
+
+        if hash_move and self.is_valid_move(hash_move):
+            yield hash_move
+
+        position = self.position
+        empty = ~position.occupied & MASK64
+        ep_bit = 0 if position.ep_square is None else 1 << position.ep_square
+        enemy = position.occupancy[self.opponent_colour]
+        stages = (
+            (enemy, enemy | ep_bit, False),
+            (0, empty & PROMOTION_RANKS, False),
+            (empty, empty & ~PROMOTION_RANKS & ~ep_bit, True),
+        )
+        for targets, pawn_targets, castling in stages:
+            del moves[:]
+            self.set_stage(targets, pawn_targets, castling)
+            self.generate_king_moves()
+            if not self.in_double_check:
+                self.generate_piece_moves()
+            if order is not None:
+                for move in order(moves):
+                    if move != hash_move:
+                        yield move
+                continue
+            for index in range(len(moves)):
+                move = moves[index]
+                if move != hash_move:
+                    yield move
+
+    def set_stage(self, targets: int, pawn_targets: int, castling: bool) -> None:
+        """
+        Limit generation to moves landing on `targets`, or `pawn_targets` for
+        pawns, on top of any check. Castling is only generated when asked.
+        """
+        self.stage_mask = targets
+        self.target_mask = targets & self.check_mask
+        ep_square = self.position.ep_square
+        ep_bit = 0 if ep_square is None else 1 << ep_square
+        self.pawn_mask = pawn_targets & (self.check_mask | ep_bit)
+        self.castling_stage = castling
+
+    def is_valid_move(self, move: int) -> bool:
+        """
+        Check a move, such as one from a hash table, is legal here by
+        generating the moves of the piece on its from square. Needs the
+        king attacks and opponent attacks of the current position.
+        """
+        from_sq = move & 63
+        piece = self.position.board[from_sq]
+        if not piece or piece >> 3 != self.friendly_colour:
+            return False
+        kind = piece & 7
+        if self.in_double_check and kind != KING:
+            return False
+
+        moves = self.moves
+        del moves[:]
+        self.set_stage(MASK64, MASK64, True)
+        if kind == KING:
+            self.generate_king_moves()
+        elif kind == PAWN:
+            self.get_pawn_moves(from_sq)
+        elif kind == KNIGHT:
+            self.get_knight_moves(from_sq)
+        else:
+            self.get_sliding_moves(from_sq, kind)
+        found = move in moves
+        del moves[:]
+        return found
+
+    def generate_piece_moves(self) -> None:
+        """Generate moves for everything but the king."""
+        board = self.position.board
+        for square in iter_bits(self.position.occupancy[self.friendly_colour]):
+            kind = board[square] & 7
+            if kind == PAWN:
+                self.get_pawn_moves(square)
+            elif kind == KNIGHT:
+                self.get_knight_moves(square)
+            elif kind != KING:
+                self.get_sliding_moves(square, kind)
+
+    def is_legal(self, move: int) -> bool:
+        """Play the move and make sure it doesn't leave our king attacked."""
+        position = self.position
+        position.make_move(move)
+        legal = not position.in_check(self.friendly_colour)
+        position.unmake_move()
+        return legal
+
+    def opponent_pieces(self, candidates: int, kind: int) -> int:
+        """
+        Subset of `candidates` (already limited to opponent pieces) holding
+        the given kind. Rooks and bishops include queens.
+        """
+        board = self.position.board
+        found = 0
+        for square in iter_bits(candidates):
+            piece_kind = board[square] & 7
+            if piece_kind == kind or (piece_kind == QUEEN and kind in (ROOK, BISHOP)):
+                found |= 1 << square
+        return found
+
+    def generate_attacks_on_king(self) -> None:
+        """
+        Find every piece giving check, then x-ray through one layer of our own
+        pieces to find sliders pinning a piece to the king.
+        """
+        position = self.position
+        friendly = self.friendly_colour
+        king_square = position.king_squares[friendly]
+        occupied = position.occupied
+        own = position.occupancy[friendly]
+        enemy = position.occupancy[self.opponent_colour]
+
+        checkers = (
+            self.opponent_pieces(rook_attacks(king_square, occupied) & enemy, ROOK)
+            | self.opponent_pieces(bishop_attacks(king_square, occupied) & enemy, BISHOP)
+            | self.opponent_pieces(KNIGHT_ATTACKS[king_square] & enemy, KNIGHT)
+            | self.opponent_pieces(PAWN_ATTACKS[friendly][king_square] & enemy, PAWN)
+        )
+        self.checkers = checkers
+        self.in_check = checkers != 0
+        self.in_double_check = checkers & (checkers - 1) != 0
+
+        between = BETWEEN[king_square]
+        if self.in_double_check:
+            self.check_mask = 0
+        elif checkers:
+            # Capture the checker or, for a slider, block on the way.
+            self.check_mask = checkers | between[checkers.bit_length() - 1]
+
+        pinners = self.opponent_pieces(
+            xray_rook_attacks(king_square, occupied, own) & enemy, ROOK
+        ) | self.opponent_pieces(
+            xray_bishop_attacks(king_square, occupied, own) & enemy, BISHOP
+        )
+        for pinner in iter_bits(pinners):
+            line = between[pinner] | (1 << pinner)
+            pinned = line & own
+            self.pinned |= pinned
+            self.pin_lines[pinned.bit_length() - 1] = line
+
+    def generate_opponent_attacks(self) -> None:
+        """
+        Fill opponent_attack_map with every square the opponent attacks, from
+        the position's shared :class:`AttackMap`. Our king is lifted off the
+        board for it, otherwise the king could step back along a checking ray.
+        """
+        self.opponent_attack_map = self.position.attacks(self.opponent_colour).squares
+
+    def generate_king_moves(self) -> None:
+        position = self.position
+        friendly = self.friendly_colour
+        king_square = position.king_squares[friendly]
+        attacks = self.opponent_attack_map
+
+        targets = KING_ATTACKS[king_square] & ~position.occupancy[friendly] & ~attacks
+        for target in iter_bits(targets & self.stage_mask):
+            self.moves.append(king_square | target << 6)
+
+        if self.in_check or not self.castling_stage:
+            return
+        occupied = position.occupied
+        for right, from_sq, to_sq, empty, safe in CASTLING:
+            if not position.castling & right or from_sq != king_square:
+                continue
+            if occupied & empty or attacks & safe:
+                continue
+            self.moves.append(from_sq | to_sq << 6 | CASTLE << 12)
+
+    def get_knight_moves(self, start: int) -> None:
+        if self.pinned >> start & 1:
+            return
+        targets = KNIGHT_ATTACKS[start] & ~self.position.occupancy[self.friendly_colour]
+        targets &= self.target_mask
+        for target in iter_bits(targets):
+            self.moves.append(start | target << 6)
+
+    def get_sliding_moves(self, start: int, kind: int) -> None:
+        """Look up the slider's attacks and add a move for each target."""
+        position = self.position
+        targets = SLIDER_ATTACKS[kind](start, position.occupied)
+        targets &= ~position.occupancy[self.friendly_colour] & self.target_mask
+        if self.pinned >> start & 1:
+            targets &= self.pin_lines[start]
+        for target in iter_bits(targets):
+            self.moves.append(start | target << 6)
+
+    def add_pawn_move(self, from_sq: int, to_sq: int, flag: int) -> None:
+        """Add a pawn move, expanding promotions and checking pins and checks."""
+        if not self.pawn_mask >> to_sq & 1:
+            return
+        if self.pinned >> from_sq & 1 and not self.pin_lines[from_sq] >> to_sq & 1:
+            return
+        if flag == EN_PASSANT:
+            # Both pawns leave the rank at once, which can expose the king,
+            # and the captured pawn isn't on to_sq, so check_mask can't help.
+            move = from_sq | to_sq << 6 | EN_PASSANT << 12
+            if self.is_legal(move):
+                self.moves.append(move)
+        elif (1 << to_sq) & PROMOTION_RANKS:
+            move = from_sq | to_sq << 6
+            for promotion in PROMOTION_FLAGS:
+                self.moves.append(move | promotion)
+        else:
+            self.moves.append(from_sq | to_sq << 6 | flag << 12)
+
+    def get_pawn_moves(self, start: int) -> None:
+        position = self.position
+        board = position.board
+        friendly = self.friendly_colour
+        forward = 8 if friendly == WHITE else -8
+
+        target = start + forward
+        if not board[target]:
+            self.add_pawn_move(start, target, NORMAL)
+            if start >> 3 == (1 if friendly == WHITE else 6):
+                double = target + forward
+                if not board[double]:
+                    self.add_pawn_move(start, double, DOUBLE_PUSH)
+
+        enemy = position.occupancy[self.opponent_colour]
+        for target in PAWN_TARGETS[friendly][start]:
+            if enemy >> target & 1:
+                self.add_pawn_move(start, target, NORMAL)
+            elif target == position.ep_square:
+                self.add_pawn_move(start, target, EN_PASSANT)
@@ -0,0 +1,318 @@
+"""
+NNUE evaluation: a small neural network whose first layer is kept up to
+date move by move, instead of being run from scratch at every node.
+
+The inputs are HalfKP features. From each side's point of view there is one
+feature for every (own king square, piece, square) with a piece other than a
+king, 64 * 640 = 40960 of them, of which a position has at most 30 set. The
+board is seen from black's side flipped vertically with the colours swapped,
+so both points of view share one set of weights.
+
+The first layer, the feature transformer, is a bias plus the sum of the
+weight rows of the features that are set: an accumulator per point of view.
+A move only sets and clears two or three features, so an
+:class:`Accumulator` attached to the position follows the pieces it puts
+down and lifts, and adds and subtracts just those rows. The one exception is a king move,
+which changes every feature of its own side's point of view; that
+accumulator is marked stale and rebuilt the next time it is needed.
+
+What is left at each node is small: both accumulators (side to move first)
+clipped to 0..127, a hidden layer of 32 clipped units and one output.
+
+Weights are quantised, int16 with int32 biases after the first layer, and
+come from a local NumPy ``.npz`` file written by :meth:`Network.save`.
+``train_nnue.py`` fits one to the hand-crafted evaluation. NumPy is only
+needed by this module and `core.batch`.
+
+    network = Network.load("network.nnue")
+    search = Search(position, evaluate=NNUEEvaluator(network))
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+
+from .constants import WHITE, BLACK, KING
+from .tables import iter_bits
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = (
+    "FEATURES",
+    "Network",
+    "Accumulator",
+    "NNUEEvaluator",
+    "feature_index",
+    "active_features",
+)
+
+# Features per king square: ten piece kinds (five types, ours and theirs)
+# on 64 squares.
+PIECE_FEATURES = 640
+FEATURES = 64 * PIECE_FEATURES
+HIDDEN = 32
+# A first layer output, or a hidden unit, of 1.0 is worth this much.
+ACTIVATION_SCALE = 127
+# And a weight of 1.0 in the layers after the first this much.
+WEIGHT_SCALE = 64
+# Centipawns per 1.0 of network output.
+EVAL_SCALE = 400
+
+# Offset of each piece code's features from each point of view, -1 for none.
+PIECE_OFFSETS = [
+    [
+        ((code & 7) - 1) * 2 * 64 + (64 if code >> 3 != perspective else 0)
+        if 0 < code & 7 < KING
+        else -1
+        for code in range(16)
+    ]
+    for perspective in (WHITE, BLACK)
+]
+_FLIP = (0, 56)
+
+
+def feature_index(perspective: int, king_square: int, square: int, piece: int) -> int:
+    """The HalfKP feature of `piece` on `square`, seen from `perspective`."""
+    flip = _FLIP[perspective]
+    return (
+        (king_square ^ flip) * PIECE_FEATURES + PIECE_OFFSETS[perspective][piece] + (square ^ flip)
+    )
+
+
+def active_features(position: Position, perspective: int) -> List[int]:
+    """Every feature set in the position, seen from `perspective`."""
+    flip = _FLIP[perspective]
+    offsets = PIECE_OFFSETS[perspective]
+    base = (position.king_squares[perspective] ^ flip) * PIECE_FEATURES
+    board = position.board
+    return [
+        base + offsets[board[square]] + (square ^ flip)
+        for square in iter_bits(position.occupied)
+        if board[square] & 7 != KING
+    ]
+
+
+class Network:
+    """
+    Quantised HalfKP network: a feature transformer of `hidden_size` units
+    per point of view, then :data:`HIDDEN` clipped units and one output.
+    """
+
+    def __init__(
+        self,
+        ft_weights: np.ndarray,
+        ft_bias: np.ndarray,
+        hidden_weights: np.ndarray,
+        hidden_bias: np.ndarray,
+        output_weights: np.ndarray,
+        output_bias: np.ndarray,
+    ) -> None:
+        size = ft_bias.shape[0]
+        shapes = (
+            ("ft_weights", ft_weights, (FEATURES, size), np.int16),
+            ("ft_bias", ft_bias, (size,), np.int16),
+            ("hidden_weights", hidden_weights, (HIDDEN, 2 * size), np.int16),
+            ("hidden_bias", hidden_bias, (HIDDEN,), np.int32),
+            ("output_weights", output_weights, (HIDDEN,), np.int16),
+            ("output_bias", output_bias, (), np.int32),
+        )
+        for name, array, shape, dtype in shapes:
+            if array.shape != shape or array.dtype != dtype:
+                raise ValueError(
+                    f"{name} should be {np.dtype(dtype).name} {shape}, "
+                    f"not {array.dtype.name} {array.shape}"
+                )
+        self.ft_weights = ft_weights
+        self.ft_bias = ft_bias
+        self.hidden_weights = hidden_weights
+        self.hidden_bias = hidden_bias
+        self.output_weights = output_weights
+        self.output_bias = int(output_bias)
+        # Accumulators are float32: at most 31 int16 terms, so every sum is
+        # a whole number well inside its 24 bit mantissa, and adding rows up
+        # is a BLAS matrix product. The small layers run in float64, which
+        # holds their sums exactly too and multiplies several times quicker
+        # than NumPy's integer matmul. The hidden layer's division by
+        # WEIGHT_SCALE, a power of two, is exact as well, so it is done to
+        # the weights up front.
+        self._ft_weights = ft_weights.astype(np.float32)
+        self._ft_bias = ft_bias.astype(np.float32)
+        self._hidden_weights = hidden_weights / WEIGHT_SCALE
+        self._hidden_bias = hidden_bias / WEIGHT_SCALE
+        self._output_weights = output_weights.astype(np.float64)
+        self._inputs = np.empty(2 * size)
+        self._halves = (self._inputs[:size], self._inputs[size:])
+
+    def __repr__(self) -> str:
+        name = self.__class__.__name__
+        return f"<{name} HalfKP {FEATURES}x{self.hidden_size}x2-{HIDDEN}-1>"
+
+    @property
+    def hidden_size(self) -> int:
+        """Units of the feature transformer, per point of view."""
+        return self.ft_bias.shape[0]
+
+    @classmethod
+    def load(cls, path: str) -> Network:
+        """Read a network saved by :meth:`save`."""
+        with np.load(path) as data:
+            return cls(
+                data["ft_weights"],
+                data["ft_bias"],
+                data["hidden_weights"],
+                data["hidden_bias"],
+                data["output_weights"],
+                data["output_bias"],
+            )
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                ft_weights=self.ft_weights,
+                ft_bias=self.ft_bias,
+                hidden_weights=self.hidden_weights,
+                hidden_bias=self.hidden_bias,
+                output_weights=self.output_weights,
+                output_bias=np.int32(self.output_bias),
+            )
+
+    def accumulate(self, features: List[int]) -> np.ndarray:
+        """The feature transformer output for a list of set features."""
+        return self._ft_bias + self._ft_weights[features].sum(axis=0)
+
+    def change(self, signs: np.ndarray, features: List[int]) -> np.ndarray:
+        """
+        What to add to accumulators for `features` set (sign +1) or cleared
+        (-1), one accumulator per row of `signs`.
+        """
+        return signs @ self._ft_weights[features]
+
+    def forward(self, us: np.ndarray, them: np.ndarray) -> int:
+        """Centipawns for the side whose accumulator is `us`."""
+        inputs = self._inputs
+        first, second = self._halves
+        np.maximum(us, 0, out=first)
+        np.maximum(them, 0, out=second)
+        np.minimum(inputs, ACTIVATION_SCALE, out=inputs)
+        hidden = self._hidden_weights @ inputs
+        hidden += self._hidden_bias
+        np.floor(hidden, out=hidden)
+        np.maximum(hidden, 0, out=hidden)
+        np.minimum(hidden, ACTIVATION_SCALE, out=hidden)
+        output = int(self._output_weights @ hidden) + self.output_bias
+        return output * EVAL_SCALE // (ACTIVATION_SCALE * WEIGHT_SCALE)
+
+
+class Accumulator:
+    """
+    Feature transformer outputs of a position from both points of view,
+    followed through the position's `_put` and `_remove` as pieces move.
+
+    Each put or remove only notes the feature it sets or clears. The rows
+    are added and subtracted when :meth:`update` is called, just before an
+    evaluation, so that a move and its unmake in between cancel out and cost
+    no NumPy work at all. Most interior nodes of a search are never
+    evaluated, so most changes go that way.
+    """
+
+    __slots__ = ("position", "network", "values", "stale", "pending")
+
+    def __init__(self, position: Position, network: Network) -> None:
+        self.position = position
+        self.network = network
+        self.values = np.zeros((2, network.hidden_size), np.float32)
+        self.stale = [True, True]
+        # Per point of view, feature -> +1 set or -1 cleared since the
+        # values were last brought up to date.
+        self.pending: List[Dict[int, int]] = [{}, {}]
+        self.update()
+
+    def refresh(self, perspective: int) -> None:
+        """Rebuild one point of view from every piece on the board."""
+        self.values[perspective] = self.network.accumulate(
+            active_features(self.position, perspective)
+        )
+        self.stale[perspective] = False
+        self.pending[perspective].clear()
+
+    def update(self) -> None:
+        """Bring both points of view up to date with the board."""
+        for perspective in (WHITE, BLACK):
+            if self.stale[perspective]:
+                self.refresh(perspective)
+        white, black = self.pending
+        if white or black:
+            # Both points of view in one product, each from its own columns.
+            features = [*white, *black]
+            signs = np.zeros((2, len(features)), np.float32)
+            signs[WHITE, : len(white)] = list(white.values())
+            signs[BLACK, len(white) :] = list(black.values())
+            self.values += self.network.change(signs, features)
+            white.clear()
+            black.clear()
+
+    def _change(self, square: int, piece: int, change: int) -> None:
+        if piece & 7 == KING:
+            self.stale[piece >> 3] = True
+            return
+        king_squares = self.position.king_squares
+        for perspective in (WHITE, BLACK):
+            if self.stale[perspective]:
+                continue
+            feature = feature_index(perspective, king_squares[perspective], square, piece)
+            pending = self.pending[perspective]
+            total = pending.get(feature, 0) + change
+            if total:
+                pending[feature] = total
+            else:
+                del pending[feature]
+
+    def put(self, square: int, piece: int) -> None:
+        """Called once `piece` has been put on the empty `square`."""
+        self._change(square, piece, 1)
+
+    def remove(self, square: int, piece: int) -> None:
+        """Called once `piece` has been lifted from `square`."""
+        self._change(square, piece, -1)
+
+    def verify(self) -> None:
+        """Raise AssertionError unless the accumulators match a full rebuild."""
+        self.update()
+        for perspective in (WHITE, BLACK):
+            fresh = self.network.accumulate(active_features(self.position, perspective))
+            if not np.array_equal(self.values[perspective], fresh):
+                raise AssertionError(
+                    f"Accumulator out of step with {self.position.fen()!r}"
+                )
+
+
+class NNUEEvaluator:
+    """
+    Network evaluation, called like :func:`core.evaluate.evaluate`. The
+    first time it sees a position it attaches an :class:`Accumulator` to it,
+    which the position then keeps up to date itself.
+    """
+
+    def __init__(self, network: Network) -> None:
+        self.network = network
+
+    def __call__(self, position: Position) -> int:
+        accumulator = position.accumulator
+        if accumulator is None or accumulator.network is not self.network:
+            accumulator = position.accumulator = Accumulator(position, self.network)
+        accumulator.update()
+        values = accumulator.values
+        side = position.side
+        return self.network.forward(values[side], values[side ^ 1])
+
+    def full(self, position: Position) -> int:
+        """The same score, with both accumulators built from the board."""
+        side = position.side
+        network = self.network
+        return network.forward(
+            network.accumulate(active_features(position, side)),
+            network.accumulate(active_features(position, side ^ 1)),
+        )
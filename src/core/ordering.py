@@ -0,0 +1,122 @@
+"""
+Move ordering for search.
+
+Alpha-beta only prunes when a good move is searched early, so before a node
+searches its moves they are scored and sorted, best guess first:
+
+    - the hash move, from the transposition table or the last iteration.
+    - promotions, queen first.
+    - captures, most valuable victim first, then least valuable attacker
+      (MVV-LVA).
+    - killer moves, two quiet moves per ply that caused a cutoff in a
+      sibling node.
+    - the counter move, the quiet move that last refuted the opponent's
+      previous move.
+    - other quiet moves, by their butterfly history: how often, and how
+      deep, a move between the same two squares has caused a cutoff for
+      this side.
+
+Quiet moves are told about cutoffs through :meth:`MoveOrderer.update`.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Sequence
+
+from .constants import PAWN
+from .move import EN_PASSANT, PROMOTION
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = ("MoveOrderer",)
+
+HASH_SCORE = 1 << 30
+PROMOTION_SCORE = 1 << 28
+CAPTURE_SCORE = 1 << 26
+KILLER_SCORE = 1 << 24
+COUNTER_SCORE = KILLER_SCORE - 2
+# Histories are halved whenever one reaches this, so they stay below killers.
+HISTORY_LIMIT = 1 << 20
+
+
+class MoveOrderer:
+    """Killer, history and counter-move tables for one search, and the sort."""
+
+    def __init__(self, position: Position, max_ply: int) -> None:
+        self.position = position
+        self.killers = [[0, 0] for _ in range(max_ply + 1)]
+        # Indexed by side, then the move's from and to squares (move & 4095).
+        self.history = [[0] * 4096, [0] * 4096]
+        # Indexed by the from and to squares of the move being answered.
+        self.counters = [0] * 4096
+
+    def clear(self) -> None:
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        self.history = [[0] * 4096, [0] * 4096]
+        self.counters = [0] * 4096
+
+    def age(self) -> None:
+        """Halve the histories, so older cutoffs count for less in a new search."""
+        for history in self.history:
+            history[:] = [score >> 1 for score in history]
+
+    def is_quiet(self, move: int) -> bool:
+        """Neither a capture nor a promotion."""
+        return not self.position.board[move >> 6 & 63] and move >> 12 < EN_PASSANT
+
+    def previous_move(self) -> int:
+        history = self.position.history
+        return history[-1][0] if history else 0
+
+    def sort(self, moves: Sequence[int], ply: int, hash_move: int = 0) -> List[int]:
+        """The moves in the order they should be searched."""
+        board = self.position.board
+        killer_1, killer_2 = self.killers[ply]
+        previous = self.previous_move()
+        counter = self.counters[previous & 4095] if previous else 0
+        history = self.history[self.position.side]
+
+        scores = {}
+        for move in moves:
+            flag = move >> 12
+            victim = board[move >> 6 & 63] & 7
+            if move == hash_move:
+                score = HASH_SCORE
+            elif flag >= PROMOTION:
+                score = PROMOTION_SCORE + flag + victim
+            elif victim or flag == EN_PASSANT:
+                score = CAPTURE_SCORE + (victim or PAWN) * 8 - (board[move & 63] & 7)
+            elif move == killer_1:
+                score = KILLER_SCORE
+            elif move == killer_2:
+                score = KILLER_SCORE - 1
+            elif move == counter:
+                score = COUNTER_SCORE
+            else:
+                score = history[move & 4095]
+            scores[move] = score
+        return sorted(moves, key=scores.__getitem__, reverse=True)
+
+    def update(self, move: int, ply: int, depth: int, tried: Sequence[int]) -> None:
+        """
+        Record that the quiet `move` caused a cutoff at `ply`, with `depth`
+        plies left. The quiet moves `tried` before it lose as much history
+        as it gains.
+        """
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        previous = self.previous_move()
+        if previous:
+            self.counters[previous & 4095] = move
+
+        history = self.history[self.position.side]
+        bonus = depth * depth
+        for quiet in tried:
+            history[quiet & 4095] -= bonus
+        history[move & 4095] += bonus
+        if history[move & 4095] >= HISTORY_LIMIT:
+            self.age()
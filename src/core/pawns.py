@@ -0,0 +1,190 @@
+"""
+Pawn structure evaluation and its hash table.
+
+Pawn structure terms (doubled, isolated, backward and passed pawns, and
+the pawn shelter in front of each possible king file) take a walk over
+every pawn, but only change when a pawn moves or is taken, which most moves
+in a search don't do. So they are worked out once per pawn structure and
+kept in a :class:`PawnHash`, keyed by the position's pawn-only Zobrist key
+(see `core.zobrist`). Sibling nodes nearly always hit.
+
+Scores are (middlegame, endgame) pairs for white, like `core.pst`. The
+shelter is stored for every king file, so looking it up for wherever the
+kings stand needs no second pass.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, List, Tuple
+
+from .constants import WHITE, BLACK, PAWN
+from .tables import MASK64, PAWN_ATTACKS, iter_bits
+from .tt import table_entries
+
+if TYPE_CHECKING:
+    from .position import Position
+
+__all__ = ("PawnHash", "pawn_structure")
+
+DOUBLED = (-10, -20)
+ISOLATED = (-10, -15)
+BACKWARD = (-8, -10)
+# Passed pawn bonus by rank, counted from the pawn's own side.
+PASSED_MG = (0, 5, 10, 15, 25, 45, 70, 0)
+PASSED_EG = (0, 10, 20, 35, 60, 100, 150, 0)
+# Shelter, middlegame only, per file next to the king: a pawn still on its
+# own second rank, one that has moved up a rank, or none close enough.
+SHELTER_HOME = 12
+SHELTER_ADVANCED = 6
+SHELTER_MISSING = -15
+
+_FILE_A = 0x0101010101010101
+FILE_MASKS = [_FILE_A << file for file in range(8)]
+ADJACENT_FILES = [
+    (FILE_MASKS[file - 1] if file > 0 else 0) | (FILE_MASKS[file + 1] if file < 7 else 0)
+    for file in range(8)
+]
+
+
+def _ranks_ahead(color: int, square: int) -> int:
+    """Every square on the ranks in front of `square`, seen from `color`."""
+    rank = square >> 3
+    if color == WHITE:
+        return ~((1 << (rank + 1) * 8) - 1) & MASK64
+    return (1 << rank * 8) - 1
+
+
+def _ranks_behind_or_level(color: int, square: int) -> int:
+    return ~_ranks_ahead(color, square) & MASK64
+
+
+# Squares in front of a pawn on its own file, and on its own and the
+# adjacent files (no enemy pawn there means it is passed).
+FRONT_SPANS = [
+    [_ranks_ahead(color, square) & FILE_MASKS[square & 7] for square in range(64)]
+    for color in (WHITE, BLACK)
+]
+PASSED_MASKS = [
+    [
+        _ranks_ahead(color, square) & (FILE_MASKS[square & 7] | ADJACENT_FILES[square & 7])
+        for square in range(64)
+    ]
+    for color in (WHITE, BLACK)
+]
+# Squares on the adjacent files level with or behind a pawn, where a pawn
+# could support it.
+SUPPORT_MASKS = [
+    [_ranks_behind_or_level(color, square) & ADJACENT_FILES[square & 7] for square in range(64)]
+    for color in (WHITE, BLACK)
+]
+
+
+def pawn_structure(pawns: Tuple[int, int]) -> Tuple[int, int, Tuple[int, int], List[int]]:
+    """
+    Pawn terms for white and black pawn bitboards: middlegame and endgame
+    scores for white, the passed pawns of each colour, and the middlegame
+    shelter of each colour's king by file (white's eight first).
+    """
+    mg = eg = 0
+    passed = [0, 0]
+    shelter = [0] * 16
+    for color in (WHITE, BLACK):
+        own = pawns[color]
+        enemy = pawns[color ^ 1]
+        sign = 1 if color == WHITE else -1
+        front_spans = FRONT_SPANS[color]
+        passed_masks = PASSED_MASKS[color]
+        support_masks = SUPPORT_MASKS[color]
+        # A pawn of ours on the stop square would attack the enemy pawns
+        # attacking it.
+        stop_attackers = PAWN_ATTACKS[color]
+        forward = 8 if color == WHITE else -8
+
+        for file in range(8):
+            count = bin(own & FILE_MASKS[file]).count("1")
+            if count > 1:
+                mg += sign * DOUBLED[0] * (count - 1)
+                eg += sign * DOUBLED[1] * (count - 1)
+
+        for square in iter_bits(own):
+            file = square & 7
+            rank = square >> 3 if color == WHITE else 7 - (square >> 3)
+            if not own & ADJACENT_FILES[file]:
+                mg += sign * ISOLATED[0]
+                eg += sign * ISOLATED[1]
+            elif not own & support_masks[square] and enemy & stop_attackers[square + forward]:
+                mg += sign * BACKWARD[0]
+                eg += sign * BACKWARD[1]
+            if not enemy & passed_masks[square] and not own & front_spans[square]:
+                passed[color] |= 1 << square
+                mg += sign * PASSED_MG[rank]
+                eg += sign * PASSED_EG[rank]
+
+        home = 0xFF00 if color == WHITE else 0xFF << 48
+        advanced = 0xFF0000 if color == WHITE else 0xFF << 40
+        for king_file in range(8):
+            score = 0
+            for file in range(max(king_file - 1, 0), min(king_file + 1, 7) + 1):
+                if own & home & FILE_MASKS[file]:
+                    score += SHELTER_HOME
+                elif own & advanced & FILE_MASKS[file]:
+                    score += SHELTER_ADVANCED
+                else:
+                    score += SHELTER_MISSING
+            shelter[color * 8 + king_file] = score
+    return mg, eg, (passed[WHITE], passed[BLACK]), shelter
+
+
+class PawnHash:
+    """
+    Pawn key -> pawn structure terms, sized like the transposition table
+    (see :func:`core.tt.table_entries`). A miss works the terms out and
+    replaces whatever was in the slot. Counts probes and hits.
+
+        index = pawn_hash.probe(position)
+        mg, eg = pawn_hash.mg[index], pawn_hash.eg[index]
+        passed = pawn_hash.passed[2 * index + color]
+        shelter = pawn_hash.shelter[16 * index + 8 * color + king_file]
+    """
+
+    ENTRY_BYTES = 8 + 2 + 2 + 2 * 8 + 16 * 2
+
+    def __init__(self, size_mb: float) -> None:
+        entries = table_entries(size_mb, self.ENTRY_BYTES)
+        self.mask = entries - 1
+        self.keys = array("Q", bytes(8 * entries))
+        self.mg = array("h", bytes(2 * entries))
+        self.eg = array("h", bytes(2 * entries))
+        self.passed = array("Q", bytes(16 * entries))
+        self.shelter = array("h", bytes(32 * entries))
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return self.mask + 1
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} entries={len(self)} hit_rate={self.hit_rate:.1%}>"
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def probe(self, position: Position) -> int:
+        """Index of the entry for the position's pawns, filling it on a miss."""
+        self.probes += 1
+        key = position.pawn_key
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return index
+        mg, eg, passed, shelter = pawn_structure(
+            (position.pieces_of(WHITE, PAWN), position.pieces_of(BLACK, PAWN))
+        )
+        self.keys[index] = key
+        self.mg[index] = mg
+        self.eg[index] = eg
+        self.passed[2 * index] = passed[WHITE]
+        self.passed[2 * index + 1] = passed[BLACK]
+        self.shelter[16 * index : 16 * index + 16] = array("h", shelter)
+        return index
@@ -0,0 +1,206 @@
+"""
+Perft, the move generator's correctness and speed test: count every leaf of
+the legal move tree to a fixed depth, and compare with known counts.
+
+    perft(Position.from_fen(START_FEN), 4) == 197281
+
+Deep perfts can be shared out over processes with :func:`parallel_perft`,
+and a :class:`PerftHash` lets transposed subtrees be counted once.
+"""
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .backends import BACKENDS, backend_name, generator_for
+from .move import Move
+from .position import Position, START_FEN
+from .tt import table_entries
+
+__all__ = ("PERFT_POSITIONS", "PerftHash", "perft", "divide", "parallel_perft")
+
+# Standard reference positions, with the node count at depth 1, 2, 3, ...
+PERFT_POSITIONS: Dict[str, Tuple[str, List[int]]] = {
+    "start": (
+        START_FEN,
+        [20, 400, 8902, 197281, 4865609, 119060324],
+    ),
+    "kiwipete": (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603, 193690690],
+    ),
+    "position3": (
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624, 11030083],
+    ),
+    "position4": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    "position4_mirrored": (
+        "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    "position5": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487, 89941194],
+    ),
+    "position6": (
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079, 89890, 3894594, 164075551],
+    ),
+}
+
+
+class PerftHash:
+    """
+    (Zobrist key, depth) -> node count, sized like the transposition table
+    (see :func:`core.tt.table_entries`). The slot comes from the key mixed
+    with the depth, and a new entry always replaces the old one.
+    """
+
+    ENTRY_BYTES = 8 + 8 + 1
+
+    def __init__(self, size_mb: float) -> None:
+        entries = table_entries(size_mb, self.ENTRY_BYTES)
+        self.mask = entries - 1
+        self.keys = array("Q", bytes(8 * entries))
+        self.counts = array("Q", bytes(8 * entries))
+        self.depths = array("B", bytes(entries))
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self) -> int:
+        return self.mask + 1
+
+    def _index(self, key: int, depth: int) -> int:
+        return (key ^ depth * 0x9E3779B97F4A7C15) & self.mask
+
+    def get(self, key: int, depth: int) -> int:
+        """Stored count, or -1 if the entry isn't there."""
+        self.probes += 1
+        index = self._index(key, depth)
+        if self.keys[index] == key and self.depths[index] == depth:
+            self.hits += 1
+            return self.counts[index]
+        return -1
+
+    def put(self, key: int, depth: int, count: int) -> None:
+        index = self._index(key, depth)
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.counts[index] = count
+
+
+def perft(position: Position, depth: int, table: Optional[PerftHash] = None) -> int:
+    """
+    Count leaf nodes by generating and playing every move to `depth`. Each
+    ply keeps its own generator, so move arrays are reused rather than rebuilt.
+    With a `table`, subtrees two or more plies deep are looked up and stored.
+    """
+    if depth <= 0:
+        return 1
+    generators = [generator_for(position) for _ in range(depth)]
+
+    def count(ply: int) -> int:
+        moves = generators[ply].generate_moves()
+        remaining = depth - ply
+        if remaining == 1:
+            return len(moves)
+        if table is not None:
+            nodes = table.get(position.key, remaining)
+            if nodes >= 0:
+                return nodes
+        nodes = 0
+        for move in moves:
+            position.make_move(move)
+            nodes += count(ply + 1)
+            position.unmake_move()
+        if table is not None:
+            table.put(position.key, remaining, nodes)
+        return nodes
+
+    return count(0)
+
+
+def divide(position: Position, depth: int, table: Optional[PerftHash] = None) -> Dict[str, int]:
+    """
+    Perft split by root move, keyed by the move in long algebraic notation.
+    With a `table`, the subtrees are counted through it as in :func:`perft`.
+    """
+    counts = {}
+    for move in list(generator_for(position).generate_moves()):
+        position.make_move(move)
+        counts[Move.from_code(move).uci()] = perft(position, depth - 1, table)
+        position.unmake_move()
+    return counts
+
+
+def _split(position: Position, depth: int, jobs: List[bytes]) -> None:
+    """Collect the packed position at every node `depth` plies down."""
+    if depth == 0:
+        jobs.append(position.to_bytes())
+        return
+    for move in list(generator_for(position).generate_moves()):
+        position.make_move(move)
+        _split(position, depth - 1, jobs)
+        position.unmake_move()
+
+
+# Per worker process state, set up once by _init_worker.
+_worker_class = Position
+_worker_table: Optional[PerftHash] = None
+
+
+def _init_worker(backend: str, hash_mb: float) -> None:
+    global _worker_class, _worker_table
+    _worker_class = BACKENDS[backend][0]
+    _worker_table = PerftHash(hash_mb) if hash_mb else None
+
+
+def _perft_job(job: Tuple[bytes, int]) -> int:
+    packed, depth = job
+    return perft(_worker_class.from_bytes(packed), depth, _worker_table)
+
+
+def parallel_perft(
+    position: Position,
+    depth: int,
+    workers: int,
+    split_depth: int = 1,
+    hash_mb: float = 0,
+) -> int:
+    """
+    Perft with the tree split `split_depth` plies below the root and the
+    subtrees shared out over a pool of `workers` processes. Positions travel
+    packed by :meth:`Position.to_bytes`. With `hash_mb`, each worker keeps a
+    :class:`PerftHash` of that size, and split positions reached by more than
+    one move order are only sent once.
+    """
+    split_depth = max(0, min(split_depth, depth - 1))
+    jobs: List[bytes] = []
+    _split(position, split_depth, jobs)
+
+    repeats: Dict[bytes, int] = {}
+    if hash_mb:
+        for packed in jobs:
+            # The clocks don't change the subtree, leave them out of the key.
+            repeats[packed[:34]] = repeats.get(packed[:34], 0) + 1
+        unique = {packed[:34]: packed for packed in jobs}
+        jobs = list(unique.values())
+
+    remaining = depth - split_depth
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(backend_name(position), hash_mb),
+    ) as pool:
+        counts = pool.map(
+            _perft_job,
+            [(packed, remaining) for packed in jobs],
+            chunksize=max(1, len(jobs) // (workers * 8)),
+        )
+        if hash_mb:
+            return sum(count * repeats[packed[:34]] for packed, count in zip(jobs, counts))
+        return sum(counts)
@@ -0,0 +1,515 @@
+"""
+Headless position model.
+
+A :class:`Position` is nothing but integers: a 64 entry list of pieces,
+occupancy bitboards per colour, the side to move, castling rights, en passant
+square, the move clocks and a Zobrist key (see `core.zobrist`) kept up to
+date by every make and unmake. So are a pawn-only key, and the middlegame
+and endgame piece-square scores and game phase the evaluation reads (see
+`core.pst`), and, when a network evaluates it, the network's first layer
+(see `core.nnue`). Moves, encoded as integers by `core.move`, are played
+with :meth:`Position.make_move` and taken back with
+:meth:`Position.unmake_move`, so any number of moves can be explored on a
+single instance without copying it.
+
+    pos = Position.from_fen(START_FEN)
+    pos.make_move(move)
+    pos.unmake_move()
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from .attacks import AttackMap, AttackTracker
+
+from .constants import (
+    EMPTY,
+    WHITE,
+    BLACK,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    PIECE_SYMBOLS,
+    WHITE_KINGSIDE,
+    WHITE_QUEENSIDE,
+    BLACK_KINGSIDE,
+    BLACK_QUEENSIDE,
+    make_piece,
+    square_name,
+    parse_square,
+)
+from .move import CASTLE, DOUBLE_PUSH, EN_PASSANT, PROMOTION
+from .sliders import rook_attacks, bishop_attacks, queen_attacks
+from .tables import (
+    iter_bits,
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    PAWN_ATTACKS,
+    KNIGHT_TARGETS,
+    KING_TARGETS,
+    PAWN_TARGETS,
+)
+from .pst import MG_TABLES, EG_TABLES, PHASE_TABLE
+from .zobrist import (
+    PIECE_KEYS,
+    CASTLING_KEYS,
+    SIDE_KEY,
+    PAWN_KEY_BASE,
+    ep_key,
+    compute_key,
+)
+
+if TYPE_CHECKING:
+    from .nnue import Accumulator
+
+__all__ = ("Position", "START_FEN")
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+_PIECE_FROM_SYMBOL = {
+    symbol: kind for kind, symbol in PIECE_SYMBOLS.items()
+}
+
+_CASTLING_SYMBOLS = (
+    (WHITE_KINGSIDE, "K"),
+    (WHITE_QUEENSIDE, "Q"),
+    (BLACK_KINGSIDE, "k"),
+    (BLACK_QUEENSIDE, "q"),
+)
+
+# Castling rights kept when a move touches a given square. Moving the king or
+# a rook, or capturing a rook, on its home square loses the matching right.
+_CASTLING_KEEP = [0b1111] * 64
+_CASTLING_KEEP[parse_square("e1")] &= ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+_CASTLING_KEEP[parse_square("h1")] &= ~WHITE_KINGSIDE
+_CASTLING_KEEP[parse_square("a1")] &= ~WHITE_QUEENSIDE
+_CASTLING_KEEP[parse_square("e8")] &= ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+_CASTLING_KEEP[parse_square("h8")] &= ~BLACK_KINGSIDE
+_CASTLING_KEEP[parse_square("a8")] &= ~BLACK_QUEENSIDE
+
+
+class Position:
+    """Representation of a chess position with no dependency on pygame."""
+
+    def __init__(self) -> None:
+        self.board: List[int] = [EMPTY] * 64
+        self.occupancy: List[int] = [0, 0]
+        self.occupied = 0
+        self.side = WHITE
+        self.castling = 0
+        self.ep_square: Optional[int] = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.king_squares = [-1, -1]
+        self.key = CASTLING_KEYS[0]
+        self.pawn_key = PAWN_KEY_BASE
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        self.history: List[Tuple] = []
+        self._attack_maps: List[Optional[AttackMap]] = [None, None]
+        # Set by core.nnue.NNUEEvaluator, which needs NumPy.
+        self.accumulator: Optional[Accumulator] = None
+        # Set by track_attacks.
+        self.tracker: Optional[AttackTracker] = None
+
+    @classmethod
+    def from_fen(cls, fen: str = START_FEN) -> Position:
+        """Build a position from a FEN string."""
+        position = cls()
+        sections = fen.split()
+
+        rank = 7
+        file = 0
+        for symbol in sections[0]:
+            if symbol == "/":
+                file = 0
+                rank -= 1
+            elif symbol.isnumeric():
+                file += int(symbol)
+            else:
+                color = WHITE if symbol.isupper() else BLACK
+                kind = _PIECE_FROM_SYMBOL[symbol.lower()]
+                position._put(rank * 8 + file, make_piece(color, kind))
+                file += 1
+
+        position.side = WHITE if len(sections) < 2 or sections[1] == "w" else BLACK
+
+        rights = sections[2] if len(sections) > 2 else "-"
+        for flag, symbol in _CASTLING_SYMBOLS:
+            if symbol in rights:
+                position.castling |= flag
+
+        if len(sections) > 3 and sections[3] != "-":
+            position.ep_square = parse_square(sections[3])
+        if len(sections) > 4:
+            position.halfmove_clock = int(sections[4])
+        if len(sections) > 5:
+            position.fullmove_number = int(sections[5])
+        position.key = compute_key(position)
+        return position
+
+    def fen(self) -> str:
+        """Export the position as a FEN string."""
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ""
+            empty = 0
+            for file in range(8):
+                piece = self.board[rank * 8 + file]
+                if not piece:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                symbol = PIECE_SYMBOLS[piece & 7]
+                row += symbol.upper() if piece >> 3 == WHITE else symbol
+            if empty:
+                row += str(empty)
+            rows.append(row)
+
+        rights = "".join(s for flag, s in _CASTLING_SYMBOLS if self.castling & flag)
+        ep = square_name(self.ep_square) if self.ep_square is not None else "-"
+        return " ".join(
+            (
+                "/".join(rows),
+                "w" if self.side == WHITE else "b",
+                rights or "-",
+                ep,
+                str(self.halfmove_clock),
+                str(self.fullmove_number),
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.fen()!r}>"
+
+    def to_bytes(self) -> bytes:
+        """
+        Pack the position into 37 bytes, for sending to other processes: one
+        nibble per square, then side and castling rights, the en passant
+        square (255 for none), the halfmove clock and the fullmove number.
+        """
+        board = self.board
+        packed = bytearray(board[square] | board[square + 1] << 4 for square in range(0, 64, 2))
+        packed.append(self.side | self.castling << 1)
+        packed.append(255 if self.ep_square is None else self.ep_square)
+        packed.append(min(self.halfmove_clock, 255))
+        packed += self.fullmove_number.to_bytes(2, "little")
+        return bytes(packed)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Position:
+        """Rebuild a position packed by :meth:`to_bytes`."""
+        position = cls()
+        for index in range(32):
+            low, high = data[index] & 15, data[index] >> 4
+            for square, piece in ((index * 2, low), (index * 2 + 1, high)):
+                if piece:
+                    position._put(square, piece)
+        position.side = data[32] & 1
+        position.castling = data[32] >> 1
+        position.ep_square = None if data[33] == 255 else data[33]
+        position.halfmove_clock = data[34]
+        position.fullmove_number = int.from_bytes(data[35:37], "little")
+        position.key = compute_key(position)
+        return position
+
+    def copy(self) -> Position:
+        """Independent copy of the current position, without move history."""
+        return self.__class__.from_fen(self.fen())
+
+    def piece_at(self, square: int) -> int:
+        return self.board[square]
+
+    def pieces_of(self, color: int, kind: int) -> int:
+        """Bitboard of the pieces of one colour and type."""
+        piece = make_piece(color, kind)
+        board = self.board
+        found = 0
+        for square in iter_bits(self.occupancy[color]):
+            if board[square] == piece:
+                found |= 1 << square
+        return found
+
+    def pieces(self, color: int) -> Iterator[Tuple[int, int]]:
+        """Yield (square, piece) for every piece of the given colour."""
+        for square, piece in enumerate(self.board):
+            if piece and piece >> 3 == color:
+                yield square, piece
+
+    def _put(self, square: int, piece: int) -> None:
+        """Place a piece on an empty square."""
+        self.board[square] = piece
+        self.key ^= PIECE_KEYS[piece][square]
+        self.mg_score += MG_TABLES[piece][square]
+        self.eg_score += EG_TABLES[piece][square]
+        self.phase += PHASE_TABLE[piece]
+        if piece & 7 == PAWN:
+            self.pawn_key ^= PIECE_KEYS[piece][square]
+        self.occupancy[piece >> 3] |= 1 << square
+        self.occupied |= 1 << square
+        if piece & 7 == KING:
+            self.king_squares[piece >> 3] = square
+        if self.accumulator is not None:
+            self.accumulator.put(square, piece)
+        if self.tracker is not None:
+            self.tracker.put(square, piece)
+
+    def _remove(self, square: int) -> int:
+        """Lift a piece off a square, returning it."""
+        piece = self.board[square]
+        self.board[square] = EMPTY
+        if piece:
+            self.key ^= PIECE_KEYS[piece][square]
+            self.mg_score -= MG_TABLES[piece][square]
+            self.eg_score -= EG_TABLES[piece][square]
+            self.phase -= PHASE_TABLE[piece]
+            if piece & 7 == PAWN:
+                self.pawn_key ^= PIECE_KEYS[piece][square]
+            self.occupancy[piece >> 3] &= ~(1 << square)
+            self.occupied &= ~(1 << square)
+            if self.accumulator is not None:
+                self.accumulator.remove(square, piece)
+            if self.tracker is not None:
+                self.tracker.remove(square, piece)
+        return piece
+
+    def make_move(self, move: int) -> None:
+        """
+        Play an encoded move (see `core.move`) on the position. The move must
+        have come from a generator for this exact position, no legality checks
+        are done here.
+        """
+        us = self.side
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        flag = move >> 12
+
+        if flag == EN_PASSANT:
+            captured_sq = to_sq - 8 if us == WHITE else to_sq + 8
+        else:
+            captured_sq = to_sq
+
+        self.history.append(
+            (
+                move,
+                self.board[captured_sq],
+                self.castling,
+                self.ep_square,
+                self.halfmove_clock,
+                self.key,
+            )
+        )
+        castling = self.castling
+        ep_square = self.ep_square
+
+        captured = self._remove(captured_sq) if self.board[captured_sq] else EMPTY
+        piece = self._remove(from_sq)
+        if flag >= PROMOTION:
+            self._put(to_sq, make_piece(us, flag - PROMOTION + KNIGHT))
+        else:
+            self._put(to_sq, piece)
+
+        if flag == CASTLE:
+            if to_sq > from_sq:
+                self._put(to_sq - 1, self._remove(to_sq + 1))
+            else:
+                self._put(to_sq + 1, self._remove(to_sq - 2))
+
+        self.ep_square = (from_sq + to_sq) // 2 if flag == DOUBLE_PUSH else None
+        self.castling &= _CASTLING_KEEP[from_sq] & _CASTLING_KEEP[to_sq]
+        self.key ^= (
+            CASTLING_KEYS[castling]
+            ^ CASTLING_KEYS[self.castling]
+            ^ ep_key(ep_square)
+            ^ ep_key(self.ep_square)
+            ^ SIDE_KEY
+        )
+
+        if captured or piece & 7 == PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = us ^ 1
+        if self.tracker is not None and self.tracker.debug:
+            self.tracker.verify()
+
+    def unmake_move(self) -> int:
+        """Take back the last move played with make_move, returning it."""
+        move, captured, castling, ep_square, halfmove_clock, key = self.history.pop()
+        self.side ^= 1
+        us = self.side
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        flag = move >> 12
+
+        piece = self._remove(to_sq)
+        self._put(from_sq, make_piece(us, PAWN) if flag >= PROMOTION else piece)
+
+        if flag == CASTLE:
+            if to_sq > from_sq:
+                self._put(to_sq + 1, self._remove(to_sq - 1))
+            else:
+                self._put(to_sq - 2, self._remove(to_sq + 1))
+
+        if captured:
+            if flag == EN_PASSANT:
+                self._put(to_sq - 8 if us == WHITE else to_sq + 8, captured)
+            else:
+                self._put(to_sq, captured)
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.key = key
+        if us == BLACK:
+            self.fullmove_number -= 1
+        if self.tracker is not None and self.tracker.debug:
+            self.tracker.verify()
+        return move
+
+    def make_null_move(self) -> None:
+        """
+        Pass the turn without moving, for null-move pruning. Take it back
+        with unmake_null_move. Repetitions aren't looked for across it.
+        """
+        self.history.append(
+            (0, EMPTY, self.castling, self.ep_square, self.halfmove_clock, self.key)
+        )
+        self.key ^= ep_key(self.ep_square) ^ SIDE_KEY
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.side ^= 1
+
+    def unmake_null_move(self) -> None:
+        _, _, _, ep_square, halfmove_clock, key = self.history.pop()
+        self.side ^= 1
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.key = key
+
+    def has_non_pawn_material(self, color: int) -> bool:
+        """Whether `color` has anything besides pawns and the king."""
+        board = self.board
+        for square in iter_bits(self.occupancy[color]):
+            if board[square] & 7 not in (PAWN, KING):
+                return True
+        return False
+
+    def is_repetition(self) -> bool:
+        """
+        Whether the position has been seen before with the same side to
+        move, looking back no further than the last capture or pawn move.
+        """
+        history = self.history
+        oldest = max(len(history) - self.halfmove_clock, 0)
+        for index in range(len(history) - 2, oldest - 1, -2):
+            if history[index][5] == self.key:
+                return True
+        return False
+
+    def is_square_attacked(self, square: int, by_color: int) -> bool:
+        """Check whether any piece of `by_color` attacks the given square."""
+        board = self.board
+
+        # A pawn attacks the square from wherever an opposing pawn standing
+        # on the square would attack.
+        pawn = make_piece(by_color, PAWN)
+        for target in PAWN_TARGETS[by_color ^ 1][square]:
+            if board[target] == pawn:
+                return True
+
+        knight = make_piece(by_color, KNIGHT)
+        for target in KNIGHT_TARGETS[square]:
+            if board[target] == knight:
+                return True
+
+        king = make_piece(by_color, KING)
+        for target in KING_TARGETS[square]:
+            if board[target] == king:
+                return True
+
+        occupied = self.occupied
+        candidates = self.occupancy[by_color]
+        for target in iter_bits(rook_attacks(square, occupied) & candidates):
+            if board[target] & 7 in (ROOK, QUEEN):
+                return True
+        for target in iter_bits(bishop_attacks(square, occupied) & candidates):
+            if board[target] & 7 in (BISHOP, QUEEN):
+                return True
+        return False
+
+    def piece_attacks(self, square: int, occupied: int = -1) -> int:
+        """Bitboard of the squares attacked by the piece on `square`."""
+        if occupied < 0:
+            occupied = self.occupied
+        piece = self.board[square]
+        kind = piece & 7
+        if kind == PAWN:
+            return PAWN_ATTACKS[piece >> 3][square]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[square]
+        if kind == KING:
+            return KING_ATTACKS[square]
+        if kind == ROOK:
+            return rook_attacks(square, occupied)
+        if kind == BISHOP:
+            return bishop_attacks(square, occupied)
+        if kind == QUEEN:
+            return queen_attacks(square, occupied)
+        return 0
+
+    def track_attacks(self, enabled: bool = True, debug: bool = False) -> None:
+        """
+        Keep every piece's attacks up to date move by move from now on, and
+        build attack maps from them. With `debug`, the tracker is checked
+        against a full recompute after every make and unmake, raising
+        AssertionError if it has drifted.
+        """
+        self.tracker = AttackTracker(self, debug) if enabled else None
+        self._attack_maps = [None, None]
+
+    def attacks(self, color: int) -> AttackMap:
+        """
+        The :class:`AttackMap` of `color` for the position as it stands. It
+        is built once and shared until a move changes the position.
+        """
+        attack_map = self._attack_maps[color]
+        if attack_map is None or attack_map.key != self.key:
+            attack_map = self._attack_maps[color] = AttackMap(self, color)
+        return attack_map
+
+    def attack_map(self, color: int, occupied: int = -1) -> int:
+        """Bitboard of every square attacked by `color`, given an occupancy."""
+        if occupied < 0:
+            occupied = self.occupied
+        board = self.board
+        pawn_attacks = PAWN_ATTACKS[color]
+        attacks = 0
+        for square in iter_bits(self.occupancy[color]):
+            kind = board[square] & 7
+            if kind == PAWN:
+                attacks |= pawn_attacks[square]
+            elif kind == KNIGHT:
+                attacks |= KNIGHT_ATTACKS[square]
+            elif kind == KING:
+                attacks |= KING_ATTACKS[square]
+            elif kind == ROOK:
+                attacks |= rook_attacks(square, occupied)
+            elif kind == BISHOP:
+                attacks |= bishop_attacks(square, occupied)
+            else:
+                attacks |= queen_attacks(square, occupied)
+        return attacks
+
+    def in_check(self, color: Optional[int] = None) -> bool:
+        """Check whether the king of `color` (default side to move) is attacked."""
+        color = self.side if color is None else color
+        return self.is_square_attacked(self.king_squares[color], color ^ 1)
@@ -0,0 +1,559 @@
+"""
+Game tree search: negamax with alpha-beta pruning and iterative deepening.
+
+The search plays moves on a single :class:`core.position.Position` with make
+and unmake, with one :class:`core.movegen.MoveGenerator` per ply so each
+ply's move array is reused from node to node.
+
+    search = Search(Position.from_fen(START_FEN))
+    result = search.run(depth=5, movetime=2.0)
+    print(result.best_move, result.score, result.nps)
+
+Iterative deepening searches depth 1, then 2, and so on, until the depth,
+node or time limit is reached, or :meth:`Search.stop` is called. The best
+move of each iteration is searched first in the next. The result is that of
+the deepest iteration that finished, unless the one cut short had already
+searched a root move in full and found a best move of its own. If not even
+that much was searched, the first legal move is played.
+
+Every node looks its position up in a :class:`core.tt.TranspositionTable`
+first. A stored score searched at least as deep, and with a bound that
+settles this window, is returned straight away; otherwise the stored best
+move is searched first.
+
+The other moves are sorted by a :class:`core.ordering.MoveOrderer`, and
+the search counts how many of its beta cutoffs came from the first move
+searched, which is how well that ordering is working.
+
+Leaf nodes aren't evaluated as they stand while a capture is pending.
+Quiescence search carries on from them with captures and promotions only,
+until the position is quiet. The side to move can always decline them
+("stand pat") and take the static evaluation instead. Captures that would
+leave it short of alpha even after winning the piece outright, with a
+margin to spare, are skipped (delta pruning). A side in check right at
+the horizon can't stand pat and searches every evasion instead; further
+into quiescence a check is handled like any other position, so a string
+of checks can't drag the search on.
+
+Four techniques buy depth by searching some of the tree less carefully:
+
+    - null-move pruning: before searching a node, the side to move passes
+      and the opponent gets a reduced-depth search. If they still can't
+      get the score below beta, the node is cut off without searching any
+      real move. Not tried in check, twice in a row, or without pieces
+      other than pawns, where zugzwang makes passing look too good.
+    - late move reductions: ordering puts the likely cutoffs first, so
+      quiet moves late in the list are searched a ply or two shallower, and
+      only searched again at full depth if they beat alpha after all.
+    - principal variation search: once a move has raised alpha, the others
+      are only searched with a null window (alpha, alpha + 1) to show they
+      are no better, and searched again with the full window if they are.
+    - aspiration windows: from depth 4 on, the root is searched with a
+      narrow window around the last iteration's score, widened on a fail.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Optional, Sequence
+
+from .backends import generator_for
+from .constants import PAWN
+from .evaluate import PIECE_VALUES, Evaluator
+from .move import PROMOTION, Move
+from .ordering import MoveOrderer
+from .position import Position
+from .tt import TranspositionTable, EXACT, LOWER, UPPER
+
+__all__ = ("Search", "SearchResult", "MATE", "MAX_PLY", "is_mate_score")
+
+MAX_PLY = 64
+DEFAULT_HASH_MB = 16
+MATE = 32000
+INFINITY = MATE + 1
+DRAW = 0
+
+# How often, in nodes, the clock is looked at. The node limit, being just a
+# comparison, is looked at on every node.
+_CHECK_EVERY = 1024
+
+# Material a capture can be worth beyond its victim's value, for delta pruning.
+DELTA_MARGIN = 200
+
+# Quiescence plies at which a side in check searches every evasion. Deeper
+# than that it stands pat and searches captures like any other node, or a
+# run of checks can keep quiescence search going for dozens of plies.
+QUIESCE_EVASION_PLIES = 1
+
+# Null move: only tried this many plies from the horizon, and the reply is
+# searched this much shallower (one more far from the horizon).
+NULL_MOVE_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+
+# Late move reductions: quiet moves after the first LMR_MOVES are reduced a
+# ply, after twice that two plies, when at least LMR_DEPTH plies are left.
+LMR_MOVES = 3
+LMR_DEPTH = 3
+
+# Aspiration windows: half-width in centipawns from this depth on, doubled
+# each time the score falls outside.
+ASPIRATION_WINDOW = 50
+ASPIRATION_DEPTH = 4
+
+
+def is_mate_score(score: int) -> bool:
+    return abs(score) >= MATE - MAX_PLY
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """
+    Mate scores count plies from the root, but an entry can be hit at any
+    ply, so they are stored counting from the node instead.
+    """
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    """Raised inside the tree to unwind it once a limit has been reached."""
+
+
+class SearchResult:
+    """
+    Outcome of a search: `depth` is the deepest iteration that finished, and
+    the score and pv are its own or, if the next iteration was cut short
+    after finding a best root move, that move's.
+    """
+
+    __slots__ = ("depth", "score", "pv", "nodes", "seconds")
+
+    def __init__(self, depth: int, score: int, pv: List[int], nodes: int, seconds: float) -> None:
+        self.depth = depth
+        self.score = score
+        self.pv = pv
+        self.nodes = nodes
+        self.seconds = seconds
+
+    @property
+    def best_move(self) -> int:
+        """Encoded best move, or 0 when the root has no legal moves."""
+        return self.pv[0] if self.pv else 0
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def score_text(self) -> str:
+        """Score as "cp 25" or "mate 3" (negative when being mated)."""
+        if is_mate_score(self.score):
+            plies = MATE - abs(self.score)
+            moves = (plies + 1) // 2
+            return f"mate {moves if self.score > 0 else -moves}"
+        return f"cp {self.score}"
+
+    def __str__(self) -> str:
+        pv = " ".join(Move.from_code(move).uci() for move in self.pv)
+        return (
+            f"depth {self.depth} score {self.score_text()} nodes {self.nodes} "
+            f"time {self.seconds:.3f}s nps {self.nps:,.0f} pv {pv}"
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self}>"
+
+
+class Search:
+    """
+    Alpha-beta searcher for one position. The position is searched in place
+    and is back as it was when :meth:`run` returns. The transposition table
+    is `hash_mb` megabytes (0 for none) and is kept from one run to the next,
+    as are the move ordering tables.
+
+    Every technique can be switched off on its own, to measure what it is
+    worth. Without `ordering`, only the hash move goes first and the rest
+    are searched as generated (quiescence search, which would blow up
+    without it, still sorts its captures). Without `quiescence`, leaf nodes
+    are evaluated as they stand. `null_move`, `lmr` (late move reductions),
+    `pvs` (principal variation search) and `aspiration` windows are
+    described in the module docstring. With `staged`, moves come from
+    :meth:`core.movegen.MoveGenerator.staged_moves`, so a cutoff on the hash
+    move or a capture never generates the quiet moves. Without it, every
+    move is generated up front and sorted together.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        evaluate: Optional[Callable[[Position], int]] = None,
+        hash_mb: float = DEFAULT_HASH_MB,
+        ordering: bool = True,
+        quiescence: bool = True,
+        null_move: bool = True,
+        lmr: bool = True,
+        pvs: bool = True,
+        aspiration: bool = True,
+        staged: bool = True,
+    ) -> None:
+        self.position = position
+        self.evaluate = evaluate or Evaluator()
+        self.table: Optional[TranspositionTable] = (
+            TranspositionTable(hash_mb) if hash_mb else None
+        )
+        self.ordering = ordering
+        self.orderer = MoveOrderer(position, MAX_PLY)
+        self.quiescence = quiescence
+        self.null_move = null_move
+        self.lmr = lmr
+        self.pvs = pvs
+        self.aspiration = aspiration
+        self.staged = staged
+        self.generators = [generator_for(position) for _ in range(MAX_PLY)]
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.stopped = False
+        self._deadline = 0.0
+        self._node_limit = 0
+        self._root_score = 0
+        self._pv: List[List[int]] = [[] for _ in range(MAX_PLY + 1)]
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Share of beta cutoffs in the last run made by the first move searched."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def stop(self) -> None:
+        """Ask a running search to finish, from another thread or a callback."""
+        self.stopped = True
+
+    def run(
+        self,
+        depth: int = 0,
+        nodes: int = 0,
+        movetime: float = 0.0,
+        on_iteration: Optional[Callable[[SearchResult], None]] = None,
+    ) -> SearchResult:
+        """
+        Search until `depth` plies are done, `nodes` nodes have been visited,
+        `movetime` seconds have passed or :meth:`stop` is called, whichever
+        comes first. The node limit is exact and the clock is looked at
+        every thousand or so nodes, from the first iteration on. A zero
+        limit is no limit, but at least one has to be given. `on_iteration`
+        is called with the result of every finished iteration.
+        """
+        if not (depth or nodes or movetime):
+            raise ValueError("Give at least one of depth, nodes or movetime")
+        depth = min(depth or MAX_PLY, MAX_PLY)
+        position = self.position
+        root_history = len(position.history)
+        start = time.perf_counter()
+        self._deadline = start + movetime if movetime else 0.0
+        self._node_limit = nodes
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.stopped = False
+        self._pv[0] = []
+        if self.table is not None:
+            self.table.new_search()
+        self.orderer.age()
+
+        result = SearchResult(0, 0, [], 0, 0.0)
+        for iteration in range(1, depth + 1):
+            try:
+                score = self._search_root(iteration, result)
+            except SearchAborted:
+                while len(position.history) > root_history:
+                    if position.history[-1][0]:
+                        position.unmake_move()
+                    else:
+                        position.unmake_null_move()
+                if self._pv[0]:
+                    # At least one root move was searched in full, and the
+                    # best of those replaces the last iteration's choice.
+                    pv, score = list(self._pv[0]), self._root_score
+                elif result.pv:
+                    pv, score = result.pv, result.score
+                else:
+                    move = next(self.generators[0].staged_moves(), 0)
+                    pv, score = [move] if move else [], self.evaluate(position)
+                result = SearchResult(
+                    result.depth, score, pv, self.nodes, time.perf_counter() - start
+                )
+                break
+            result = SearchResult(
+                iteration, score, list(self._pv[0]), self.nodes, time.perf_counter() - start
+            )
+            if on_iteration is not None:
+                on_iteration(result)
+            if not result.pv or is_mate_score(score) and MATE - abs(score) <= iteration:
+                break
+        return result
+
+    def _search_root(self, depth: int, previous: SearchResult) -> int:
+        """
+        One iteration. With aspiration windows, the window is centred on the
+        last iteration's score and widened on whichever side it fails.
+        """
+        first = previous.best_move
+        if not self.aspiration or depth < ASPIRATION_DEPTH or is_mate_score(previous.score):
+            return self._negamax(depth, 0, -INFINITY, INFINITY, first)
+        delta = ASPIRATION_WINDOW
+        alpha = max(previous.score - delta, -INFINITY)
+        beta = min(previous.score + delta, INFINITY)
+        while True:
+            score = self._negamax(depth, 0, alpha, beta, first)
+            if score <= alpha:
+                alpha = max(score - delta, -INFINITY)
+            elif score >= beta:
+                beta = min(score + delta, INFINITY)
+            else:
+                return score
+            first = self._pv[0][0] if self._pv[0] else first
+            delta *= 2
+
+    def _check_limits(self) -> None:
+        if (
+            self.stopped
+            or self._node_limit and self.nodes >= self._node_limit
+            or self._deadline and time.perf_counter() >= self._deadline
+        ):
+            raise SearchAborted
+
+    def _is_mated(self, ply: int) -> bool:
+        """
+        Whether the side to move is checkmated. A mate on the hundredth
+        half-move without a capture or pawn move is still a mate, not a draw.
+        """
+        position = self.position
+        return position.in_check() and not self.generators[ply].generate_moves()
+
+    def _stage_order(
+        self, ply: int, always: bool = False
+    ) -> Optional[Callable[[Sequence[int]], List[int]]]:
+        """
+        How each stage of staged_moves is sorted at `ply`: by the move
+        orderer, or left as generated when ordering is off and not `always`.
+        """
+        if not (self.ordering or always):
+            return None
+        orderer = self.orderer
+        return lambda moves: orderer.sort(moves, ply)
+
+    def _negamax(
+        self,
+        depth: int,
+        ply: int,
+        alpha: int,
+        beta: int,
+        first: int = 0,
+        allow_null: bool = True,
+    ) -> int:
+        """
+        Score of the position for the side to move, searched `depth` plies
+        deep, within the window (alpha, beta). `first` is searched before
+        the other moves when it is legal here. `allow_null` is False right
+        after a null move, so two are never played in a row.
+        """
+        if depth <= 0 and self.quiescence:
+            return self._quiesce(ply, alpha, beta)
+        self.nodes += 1
+        if not self.nodes % _CHECK_EVERY or self.stopped or self.nodes == self._node_limit:
+            self._check_limits()
+        position = self.position
+        self._pv[ply] = []
+
+        if ply and (
+            position.is_repetition()
+            or position.halfmove_clock >= 100 and not self._is_mated(ply)
+        ):
+            return DRAW
+        if depth <= 0 or ply >= MAX_PLY:
+            return self.evaluate(position)
+
+        table = self.table
+        key = position.key
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                move, score, entry_depth, bound = entry
+                if ply and entry_depth >= depth:
+                    score = score_from_table(score, ply)
+                    if (
+                        bound == EXACT
+                        or bound == LOWER and score >= beta
+                        or bound == UPPER and score <= alpha
+                    ):
+                        if move:
+                            self._pv[ply] = [move]
+                        return score
+                first = first or move
+
+        in_check = position.in_check()
+        if (
+            self.null_move
+            and allow_null
+            and ply
+            and depth >= NULL_MOVE_DEPTH
+            and not in_check
+            and not is_mate_score(beta)
+            # In zugzwang passing would be the best move, if it were legal.
+            # That's likeliest with nothing but pawns left, so don't try.
+            and position.has_non_pawn_material(position.side)
+            and self.evaluate(position) >= beta
+        ):
+            reduction = NULL_MOVE_REDUCTION + (depth > 6)
+            position.make_null_move()
+            score = -self._negamax(depth - 1 - reduction, ply + 1, -beta, 1 - beta, 0, False)
+            position.unmake_null_move()
+            if score >= beta:
+                return beta
+
+        generator = self.generators[ply]
+        orderer = self.orderer if self.ordering else None
+        if self.staged:
+            moves = generator.staged_moves(first, self._stage_order(ply))
+        else:
+            moves = generator.generate_moves()
+            if orderer is not None:
+                moves = orderer.sort(moves, ply, first)
+            elif first in moves:
+                moves = [first] + [move for move in moves if move != first]
+
+        is_quiet = self.orderer.is_quiet
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = 0
+        quiets_tried = []
+        for index, move in enumerate(moves):
+            quiet = is_quiet(move)
+            position.make_move(move)
+            if not index:
+                score = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            else:
+                # Later moves are expected to fail low: quiet ones are
+                # searched less deep, and with PVS every one is searched
+                # with a null window just to prove it, then again in full
+                # if the proof fails.
+                reduction = 0
+                if (
+                    self.lmr
+                    and quiet
+                    and index >= LMR_MOVES
+                    and depth >= LMR_DEPTH
+                    and not in_check
+                    and not position.in_check()
+                ):
+                    reduction = 1 if index < 2 * LMR_MOVES else 2
+                    reduction = min(reduction, depth - 2)
+                bound = alpha + 1 if self.pvs else beta
+                score = -self._negamax(depth - 1 - reduction, ply + 1, -bound, -alpha)
+                if reduction and score > alpha:
+                    score = -self._negamax(depth - 1, ply + 1, -bound, -alpha)
+                if self.pvs and alpha < score < beta:
+                    score = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            position.unmake_move()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    best_move = move
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if not ply:
+                        self._root_score = score
+                    if score >= beta:
+                        self.cutoffs += 1
+                        if not index:
+                            self.first_move_cutoffs += 1
+                        if orderer is not None and quiet:
+                            orderer.update(move, ply, depth, quiets_tried)
+                        break
+            if quiet:
+                quiets_tried.append(move)
+        if best == -INFINITY:
+            # No legal move.
+            return -MATE + ply if in_check else DRAW
+
+        if table is not None:
+            if best >= beta:
+                bound = LOWER
+            elif best > original_alpha:
+                bound = EXACT
+            else:
+                bound = UPPER
+            table.store(key, depth, score_to_table(best, ply), bound, best_move)
+        return best
+
+    def _quiesce(self, ply: int, alpha: int, beta: int, qply: int = 0) -> int:
+        """
+        Score of the position for the side to move, searching captures and
+        promotions until it is quiet. `qply` counts the plies since the
+        horizon. In check in the first QUIESCE_EVASION_PLIES of them every
+        evasion is searched, since standing pat isn't an option; past that
+        a check is treated like any other position.
+        """
+        self.nodes += 1
+        self.quiescence_nodes += 1
+        if not self.nodes % _CHECK_EVERY or self.stopped or self.nodes == self._node_limit:
+            self._check_limits()
+        position = self.position
+        self._pv[ply] = []
+        if ply and (
+            position.is_repetition()
+            or position.halfmove_clock >= 100 and not self._is_mated(ply)
+        ):
+            return DRAW
+        if ply >= MAX_PLY:
+            return self.evaluate(position)
+
+        generator = self.generators[ply]
+        in_check = qply < QUIESCE_EVASION_PLIES and position.in_check()
+        if in_check:
+            if self.staged:
+                moves = generator.staged_moves(0, self._stage_order(ply, True))
+            else:
+                moves = self.orderer.sort(generator.generate_moves(), ply)
+            best = -INFINITY
+        else:
+            best = self.evaluate(position)
+            if best >= beta:
+                return best
+            if best > alpha:
+                alpha = best
+            moves = generator.generate_captures()
+            if not moves:
+                return best
+            moves = self.orderer.sort(moves, ply)
+
+        board = position.board
+        for move in moves:
+            if not in_check and move >> 12 < PROMOTION:
+                # Even winning the victim for free can't lift it to alpha.
+                victim = board[move >> 6 & 63] & 7 or PAWN
+                if best + PIECE_VALUES[victim] + DELTA_MARGIN <= alpha:
+                    continue
+            position.make_move(move)
+            score = -self._quiesce(ply + 1, -beta, -alpha, qply + 1)
+            position.unmake_move()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if score >= beta:
+                        break
+        if best == -INFINITY:
+            return -MATE + ply
+        return best
@@ -0,0 +1,107 @@
+"""
+Lazy SMP: parallel search over processes.
+
+Python threads share one interpreter lock, so a CPU-bound search gains
+nothing from them. Instead every worker process runs its own full
+:class:`core.search.Search` of the same root position, and all of them
+read and write one :class:`core.tt.SharedTranspositionTable`. There is no
+other communication: a worker simply finds positions already searched by the
+others in the table and skips them.
+
+Workers that searched identically would mostly duplicate each other, so
+every worker but the first is nudged off course: odd workers aim a ply
+deeper, and each one starts with its own random history scores, so quiet
+moves are tried in a different order. The first worker's result is the
+answer. Once it is done, the others are told to stop through a flag in a
+second small block of shared memory.
+
+    result = parallel_search(position, depth=6, workers=8, hash_mb=64)
+"""
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Tuple
+
+from .backends import BACKENDS, backend_name
+from .position import Position
+from .search import DEFAULT_HASH_MB, Search, SearchResult
+from .tt import SharedTranspositionTable
+
+__all__ = ("parallel_search",)
+
+# Largest random history a helper's quiet moves start with.
+HISTORY_NOISE = 64
+
+
+class _WorkerSearch(Search):
+    """Search that also stops when the shared stop flag is raised."""
+
+    def __init__(self, position: Position, stop_flag: memoryview) -> None:
+        super().__init__(position, hash_mb=0)
+        self.stop_flag = stop_flag
+
+    def _check_limits(self) -> None:
+        if self.stop_flag[0]:
+            self.stopped = True
+        super()._check_limits()
+
+
+def _search_job(
+    job: Tuple[bytes, str, int, int, str, float, str]
+) -> Tuple[int, int, List[int], int]:
+    """Run one worker's search, returning (depth, score, pv, nodes)."""
+    packed, backend, depth, index, table_name, hash_mb, stop_name = job
+    position = BACKENDS[backend][0].from_bytes(packed)
+    table = SharedTranspositionTable.attach(table_name, hash_mb)
+    stop = SharedMemory(stop_name)
+    try:
+        search = _WorkerSearch(position, stop.buf)
+        search.table = table
+        if index:
+            noise = random.Random(index)
+            for history in search.orderer.history:
+                history[:] = [noise.randrange(HISTORY_NOISE) for _ in history]
+            depth += index & 1
+        result = search.run(depth)
+        return result.depth, result.score, result.pv, result.nodes
+    finally:
+        table.close()
+        stop.close()
+
+
+def parallel_search(
+    position: Position, depth: int, workers: int, hash_mb: float = DEFAULT_HASH_MB
+) -> SearchResult:
+    """
+    Search `position` to `depth` with `workers` processes sharing a
+    transposition table of `hash_mb` megabytes. The result is the first
+    worker's, with the nodes of every worker added up. Positions travel
+    packed by :meth:`Position.to_bytes`, so the game history (and with it
+    repetitions before the root) is left behind.
+    """
+    start = time.perf_counter()
+    table = SharedTranspositionTable(hash_mb)
+    stop = SharedMemory(create=True, size=1)
+    stop.buf[0] = 0
+    backend = backend_name(position)
+    packed = position.to_bytes()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _search_job,
+                    (packed, backend, depth, index, table.name, hash_mb, stop.name),
+                )
+                for index in range(workers)
+            ]
+            main_depth, score, pv, nodes = futures[0].result()
+            stop.buf[0] = 1
+            nodes += sum(future.result()[3] for future in futures[1:])
+    finally:
+        table.close()
+        stop.close()
+        stop.unlink()
+    return SearchResult(main_depth, score, pv, nodes, time.perf_counter() - start)
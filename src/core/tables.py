@@ -0,0 +1,90 @@
+"""
+Attack tables, built once at import.
+
+Every table is indexed by square (a1 = 0, h8 = 63) and comes in two forms:
+a bitboard of attacked squares for the bitboard backend, and a tuple of
+square indexes for code walking the mailbox. Pawn tables are indexed by
+colour first and hold the squares a pawn of that colour attacks.
+
+    for target in KNIGHT_TARGETS[square]:
+        ...
+"""
+from typing import Iterable, Iterator, List, Tuple
+
+from .constants import WHITE, BLACK
+
+__all__ = (
+    "MASK64",
+    "iter_bits",
+    "offset",
+    "ray",
+    "KNIGHT_OFFSETS",
+    "KING_OFFSETS",
+    "KNIGHT_ATTACKS",
+    "KING_ATTACKS",
+    "PAWN_ATTACKS",
+    "KNIGHT_TARGETS",
+    "KING_TARGETS",
+    "PAWN_TARGETS",
+)
+
+KNIGHT_OFFSETS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_OFFSETS = ((0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (1, -1), (-1, -1), (-1, 1))
+PAWN_OFFSETS = {
+    WHITE: ((-1, 1), (1, 1)),
+    BLACK: ((-1, -1), (1, -1)),
+}
+
+
+MASK64 = 0xFFFF_FFFF_FFFF_FFFF
+
+
+def iter_bits(bitboard: int) -> Iterator[int]:
+    """Yield the index of every set bit, lowest first."""
+    while bitboard:
+        low = bitboard & -bitboard
+        yield low.bit_length() - 1
+        bitboard ^= low
+
+
+def offset(square: int, file_offset: int, rank_offset: int) -> int:
+    """
+    Square reached from `square` by a file and rank offset, or -1 if that
+    falls off the board.
+    """
+    file = (square & 7) + file_offset
+    rank = (square >> 3) + rank_offset
+    if 0 <= file < 8 and 0 <= rank < 8:
+        return rank * 8 + file
+    return -1
+
+
+def ray(square: int, direction: Tuple[int, int]) -> List[int]:
+    """Squares from `square` to the board edge in a direction, not including it."""
+    squares = []
+    target = offset(square, *direction)
+    while target >= 0:
+        squares.append(target)
+        target = offset(target, *direction)
+    return squares
+
+
+def _targets(offsets: Iterable[Tuple[int, int]]) -> List[Tuple[int, ...]]:
+    table = []
+    for square in range(64):
+        targets = (offset(square, *step) for step in offsets)
+        table.append(tuple(target for target in targets if target >= 0))
+    return table
+
+
+def _bitboards(targets: List[Tuple[int, ...]]) -> List[int]:
+    return [sum(1 << target for target in squares) for squares in targets]
+
+
+KNIGHT_TARGETS = _targets(KNIGHT_OFFSETS)
+KING_TARGETS = _targets(KING_OFFSETS)
+PAWN_TARGETS = (_targets(PAWN_OFFSETS[WHITE]), _targets(PAWN_OFFSETS[BLACK]))
+
+KNIGHT_ATTACKS = _bitboards(KNIGHT_TARGETS)
+KING_ATTACKS = _bitboards(KING_TARGETS)
+PAWN_ATTACKS = (_bitboards(PAWN_TARGETS[WHITE]), _bitboards(PAWN_TARGETS[BLACK]))
@@ -0,0 +1,250 @@
+"""
+Transposition table for search.
+
+Positions reached by different move orders share a Zobrist key (see
+`core.zobrist`), so what was learned searching one of them can be reused
+for the others: a score with the depth it was searched to and whether it is
+exact or only a bound, and the best move found, which is worth searching
+first even when the score can't be used.
+
+Entries live in flat preallocated arrays, one slot per entry, indexed by the
+low bits of the key. A new entry replaces the one in its slot if that is for
+the same position, was stored by an earlier search, or wasn't searched any
+deeper; so deep results survive the many shallow ones stored around them,
+but stop crowding out new ones once their search is over.
+
+:class:`SharedTranspositionTable` keeps the same entries in a
+`multiprocessing.shared_memory` block, so search processes running side by
+side can share what they find (see `core.smp`).
+"""
+from __future__ import annotations
+
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Tuple
+
+__all__ = (
+    "TranspositionTable",
+    "SharedTranspositionTable",
+    "EXACT",
+    "LOWER",
+    "UPPER",
+    "table_entries",
+)
+
+# Bound types. LOWER means the score is at least the stored one (a beta
+# cutoff), UPPER at most (no move raised alpha).
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# The info byte holds the bound in the low two bits and the generation above.
+_BOUND_BITS = 2
+_BOUND_MASK = (1 << _BOUND_BITS) - 1
+_GENERATIONS = 1 << (8 - _BOUND_BITS)
+
+
+def table_entries(size_mb: float, entry_bytes: int) -> int:
+    """
+    Entries for a hash table of at most `size_mb` megabytes, `entry_bytes`
+    each: the largest power of two that fits, and at least one, so that the
+    low bits of a key pick the slot. The perft and pawn hashes are sized
+    the same way.
+    """
+    entries = 1
+    while entries * 2 * entry_bytes <= size_mb * 1024 * 1024:
+        entries *= 2
+    return entries
+
+
+class TranspositionTable:
+    """
+    Zobrist key -> (move, score, depth, bound), sized in megabytes (see
+    :func:`table_entries`). Keeps counts of probes, hits and stores for
+    tuning its size.
+    """
+
+    # key, move, score, depth, bound and generation
+    ENTRY_BYTES = 8 + 2 + 2 + 1 + 1
+
+    def __init__(self, size_mb: float) -> None:
+        entries = table_entries(size_mb, self.ENTRY_BYTES)
+        self.mask = entries - 1
+        self.keys = array("Q", bytes(8 * entries))
+        self.moves = array("H", bytes(2 * entries))
+        self.scores = array("h", bytes(2 * entries))
+        self.depths = array("B", bytes(entries))
+        self.info = array("B", bytes(entries))
+        self.generation = 1
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        return self.mask + 1
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} entries={len(self)} "
+            f"hit_rate={self.hit_rate:.1%} fill_rate={self.fill_rate():.1%}>"
+        )
+
+    def clear(self) -> None:
+        """Forget every entry and reset the counters."""
+        entries = len(self)
+        self.keys[:] = array("Q", bytes(8 * entries))
+        self.moves[:] = array("H", bytes(2 * entries))
+        self.scores[:] = array("h", bytes(2 * entries))
+        self.depths[:] = array("B", bytes(entries))
+        self.info[:] = array("B", bytes(entries))
+        self.generation = 1
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """
+        Start a new generation. Entries from earlier searches are kept and
+        can still be hit, but any new entry may replace them.
+        """
+        self.generation = self.generation % (_GENERATIONS - 1) + 1
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """(move, score, depth, bound) stored for the key, or None."""
+        self.probes += 1
+        index = key & self.mask
+        if self.keys[index] != key or not self.info[index]:
+            return None
+        self.hits += 1
+        return (
+            self.moves[index],
+            self.scores[index],
+            self.depths[index],
+            self.info[index] & _BOUND_MASK,
+        )
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        index = key & self.mask
+        info = self.info[index]
+        if self.keys[index] == key:
+            # Keep the old move when the new search didn't find one.
+            if not move:
+                move = self.moves[index]
+        elif info >> _BOUND_BITS == self.generation and depth < self.depths[index]:
+            return
+        self.stores += 1
+        self.keys[index] = key
+        self.moves[index] = move
+        self.scores[index] = score
+        self.depths[index] = depth
+        self.info[index] = self.generation << _BOUND_BITS | bound
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of probes that found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def fill_rate(self, sample: int = 1000) -> float:
+        """
+        Share of entries in use, estimated from the first `sample` slots
+        (keys are random, so every part of the table fills alike).
+        Pass 0 to count the whole table.
+        """
+        count = min(sample or len(self), len(self))
+        info = self.info
+        return sum(1 for index in range(count) if info[index]) / count
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    :class:`TranspositionTable` in shared memory, for several processes at
+    once. Create it in one process, then :meth:`attach` to it by name in the
+    others; the creator unlinks it with :meth:`close`.
+
+    There are no locks. Each entry is two 64-bit words: the move, score,
+    depth and info packed into one, and the key XOR-ed with that word in the
+    other. Two processes writing the same slot at once can leave the words
+    from different entries, and then the XOR no longer gives the key, so the
+    entry just looks missing. The probe, hit and store counts are per
+    process.
+    """
+
+    ENTRY_BYTES = 16
+
+    def __init__(self, size_mb: float, name: Optional[str] = None) -> None:
+        entries = table_entries(size_mb, self.ENTRY_BYTES)
+        self.mask = entries - 1
+        self.owner = name is None
+        if self.owner:
+            self.memory = SharedMemory(create=True, size=entries * self.ENTRY_BYTES)
+            self.memory.buf[:] = bytes(len(self.memory.buf))
+        else:
+            self.memory = SharedMemory(name)
+        self.checks = self.memory.buf[: 8 * entries].cast("Q")
+        self.data = self.memory.buf[8 * entries : 16 * entries].cast("Q")
+        self.generation = 1
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @classmethod
+    def attach(cls, name: str, size_mb: float) -> SharedTranspositionTable:
+        """Open a table created by another process with the same size."""
+        return cls(size_mb, name)
+
+    def close(self) -> None:
+        """Let go of the shared block, and free it if this table created it."""
+        self.checks.release()
+        self.data.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def clear(self) -> None:
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+        self.generation = 1
+        self.reset_stats()
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        self.probes += 1
+        index = key & self.mask
+        data = self.data[index]
+        if not data or self.checks[index] ^ data != key:
+            return None
+        self.hits += 1
+        return (
+            data & 0xFFFF,
+            (data >> 16 & 0xFFFF) - 0x8000,
+            data >> 32 & 0xFF,
+            data >> 40 & _BOUND_MASK,
+        )
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        index = key & self.mask
+        old = self.data[index]
+        if self.checks[index] ^ old == key:
+            if not move:
+                move = old & 0xFFFF
+        elif old >> 40 + _BOUND_BITS == self.generation and depth < (old >> 32 & 0xFF):
+            return
+        self.stores += 1
+        data = (
+            move
+            | (score + 0x8000) << 16
+            | min(depth, 0xFF) << 32
+            | (self.generation << _BOUND_BITS | bound) << 40
+        )
+        self.data[index] = data
+        self.checks[index] = key ^ data
+
+    def fill_rate(self, sample: int = 1000) -> float:
+        count = min(sample or len(self), len(self))
+        data = self.data
+        return sum(1 for index in range(count) if data[index]) / count
@@ -0,0 +1,76 @@
+"""
+Zobrist hashing keys.
+
+A position's key is the XOR of one random 64-bit number per (piece, square),
+one for the castling rights, one for the en passant file and one when black
+is to move. Playing a move only changes a few of those terms, so
+:class:`core.position.Position` keeps its key up to date by XOR-ing them in
+and out as pieces are put down and lifted.
+
+A second, pawn-only key covers nothing but the pawns, for the pawn hash
+table in `core.pawns`: positions with the same pawns share it whatever the
+other pieces are doing.
+
+The numbers come from a fixed seed, so keys are the same from one run, or
+one process, to the next.
+"""
+import random
+from typing import List
+
+from .constants import EMPTY, PAWN, file_of
+
+__all__ = (
+    "PIECE_KEYS",
+    "CASTLING_KEYS",
+    "EP_FILE_KEYS",
+    "SIDE_KEY",
+    "PAWN_KEY_BASE",
+    "ep_key",
+    "compute_key",
+    "compute_pawn_key",
+)
+
+_random = random.Random(0x5EED_C4E55)
+
+
+def _key() -> int:
+    return _random.getrandbits(64)
+
+
+# Indexed by piece code (see core.constants.make_piece), then square.
+PIECE_KEYS: List[List[int]] = [
+    [_key() for _ in range(64)] if code & 7 and code & 7 <= 6 else [0] * 64
+    for code in range(16)
+]
+CASTLING_KEYS: List[int] = [_key() for _ in range(16)]
+EP_FILE_KEYS: List[int] = [_key() for _ in range(8)]
+SIDE_KEY = _key()
+# Pawn keys start from this rather than 0, so no position's pawn key matches
+# an empty table slot.
+PAWN_KEY_BASE = _key()
+
+
+def ep_key(ep_square) -> int:
+    """Key term for an en passant square, 0 when there isn't one."""
+    return 0 if ep_square is None else EP_FILE_KEYS[file_of(ep_square) - 1]
+
+
+def compute_key(position) -> int:
+    """Key of a position worked out from scratch, ignoring the stored one."""
+    key = 0
+    for square, piece in enumerate(position.board):
+        if piece != EMPTY:
+            key ^= PIECE_KEYS[piece][square]
+    key ^= CASTLING_KEYS[position.castling] ^ ep_key(position.ep_square)
+    if position.side:
+        key ^= SIDE_KEY
+    return key
+
+
+def compute_pawn_key(position) -> int:
+    """Pawn-only key of a position worked out from scratch."""
+    key = PAWN_KEY_BASE
+    for square, piece in enumerate(position.board):
+        if piece & 7 == PAWN:
+            key ^= PIECE_KEYS[piece][square]
+    return key
@@ -12,6 +12,7 @@ import pygame
 import move_generator as mg
 from fen import START_FEN, PositionInfo, load_from_fen
 from move import Flag, Move, MoveHandler
+from core.backends import DEFAULT_BACKEND
 
 if TYPE_CHECKING:
     from board import Board
@@ -23,11 +24,15 @@ _load_position = load_from_fen(START_FEN)
 
 class GameHandler:
     def __init__(
-        self, board: Board, scene: Scene, load_position: PositionInfo = _load_position
+        self,
+        board: Board,
+        scene: Scene,
+        load_position: PositionInfo = _load_position,
+        backend: str = DEFAULT_BACKEND,
     ):
         self.clicks = []
         self.board = board
-        self.board.init(load_position)
+        self.board.init(load_position, backend)
         white_to_move = load_position.whiteToMove
         self.move_handler = MoveHandler(board, white_to_move=white_to_move)
         self.move_handler.generate_moves()
@@ -70,7 +75,7 @@ class GameHandler:
                 user_move = Move(from_sq, to_sq)
                 if user_move in self.move_generator:
                     user_move = self.move_generator.get_move(user_move)
-                    self.board.make_move(user_move)
+                    self.move_handler.make_move(user_move)
                     self.end_turn()
                 else:
                     self.reset_clicks()
@@ -98,8 +103,10 @@ class GameHandler:
     def check_arrow_event(self, event):
         if event.key == pygame.K_LEFT:
             self.move_handler.undo()
+            self.end_turn()
         elif event.key == pygame.K_RIGHT:
             self.move_handler.redo()
+            self.end_turn()
         else:
             pass
 
@@ -4,8 +4,8 @@ from dataclasses import dataclass, field
 import Pieces as p
 import constants as c
 from location import Location
+from core.position import START_FEN
 
-START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 FEN1 = "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2 "
 
 piece_type_from_symb = {
@@ -27,10 +27,11 @@ class PositionInfo:
     blackCastleKingSide: bool = False
     blackCastleQueenSide: bool = False
     whiteToMove: bool = True
+    fen: str = START_FEN
 
 
 def load_from_fen(fen):
-    loadedPositionInfo = PositionInfo()
+    loadedPositionInfo = PositionInfo(fen=fen)
 
     sections = fen.split(" ")
     file = 0
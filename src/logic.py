@@ -15,64 +15,36 @@ Direction = Union[Tuple[int, int], List[int]]
 
 def build(current: Location, fileOffset: int, rankOffset: int) -> Location:
     """
-    Generates a new Location class for where a given Location will end up
-    based on a given file and rank offset.
+    Finds the Location a given Location will end up on based on a given
+    file and rank offset. Locations are shared, so nothing is allocated.
 
-    returns: Location()
+    returns: Location(), or None if the offset leaves the board.
     """
     if not isinstance(current, Location):
         raise ValueError("Please pass current position as Location class")
 
-    new_file = current.file.value + fileOffset
-    new_rank = current.rank + rankOffset
+    return current.offset(fileOffset, rankOffset)  # type: ignore
 
-    if not is_valid(new_file) or not is_valid(new_rank):
-        return None # type: ignore
 
-    return Location(c.Files(new_file), new_rank)
-
-
-def ray_from(start: Union[Location, Square], direction: Direction):
+def ray_from(start: Union[Location, Square], direction: Direction) -> Tuple[Location, ...]:
     """
-    Create ray starting a given `Location` or `Square`, going outwards in a given direction.
-    Resulting ray does NOT include start square.
+    Ray starting at a given `Location` or `Square`, going outwards in a given direction.
+    Resulting ray does NOT include start square. Rays are precomputed per
+    square and direction, the returned tuple is shared and must not be changed.
     """
 
     if direction[0] == 0 and direction[1] == 0:
         raise ValueError("Direction iterable cannot only contain 0's.")
-    ray = []
-    file_dir = direction[0]
-    rank_dir = direction[1]
-
-    diagonal_slide = False if (file_dir == 0 or rank_dir == 0) else True
-
-    if diagonal_slide:
-        file_end, file_step = (9, 1) if file_dir > 0 else (0, -1)
-        rank_end, rank_step = (9, 1) if rank_dir > 0 else (0, -1)
-        rank_range = range(start.rank, rank_end, rank_step)
-        file_range = range(start.file.value, file_end, file_step)
-        for file, rank in zip(file_range, rank_range):
-            loc = Location(c.Files(file), rank)
-            ray.append(loc)
-
-    else:
-        if file_dir == 0:
-            end, step = (9, 1) if rank_dir > 0 else (0, -1)
-            rank_increments = range(start.rank, end, step)
-            for rank in rank_increments:
-                loc = Location(start.file, rank)
-                ray.append(loc)
-        else:
-            end, step = (9, 1) if file_dir > 0 else (0, -1)
-            file_increments = range(start.file.value, end, step)
-            for file in file_increments:
-                loc = Location(c.Files(file), start.rank)
-                ray.append(loc)
-
-    return ray[1:]
-
-
-def square_is_capturable(start: Union[Square, Location], direction: Direction, board: Board) -> bool:
+    file_dir = (direction[0] > 0) - (direction[0] < 0)
+    rank_dir = (direction[1] > 0) - (direction[1] < 0)
+
+    location = start if isinstance(start, Location) else start.location
+    return location.ray((file_dir, rank_dir))
+
+
+def square_is_capturable(
+    start: Union[Square, Location], direction: Direction, board: Board
+) -> bool:
 
     if isinstance(start, Square):
         start = start.location
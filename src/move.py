@@ -14,13 +14,16 @@ from typing import (
 
 import logic
 import constants as c
+from location import Location
 from squares import Square
-from abstract_piece import AbstractPiece
+from core.constants import WHITE, BLACK, color_from_enum
+from core.tables import iter_bits
 
 if TYPE_CHECKING:
+    from abstract_piece import AbstractPiece
     from Pieces import Rook
 
-__all__ = ("Move", "MoveHandler", "Flag", "EnpassantMove", "CastleMove")
+__all__ = ("Move", "MoveHandler", "Flag", "EnpassantMove", "CastleMove", "UndoRecord")
 
 logger = logging.getLogger(__file__)
 f_handler = logging.FileHandler("chess.log")
@@ -39,16 +42,6 @@ class Flag(Enum):
     CHECKMATE = auto()
 
 
-def _clean(**attrs):
-    """private method to reset certain attributes of a piece. Used for Un/Re do."""
-    try:
-        attrs["_selected"] = False
-        attrs["_alive"] = True
-    except TypeError as error:
-        print(f"Can't unpack due to: {error}")
-    return attrs
-
-
 @dataclass
 class MovePieceHolder:
     """
@@ -67,7 +60,30 @@ class MovePieceHolder:
     @captured_piece.setter
     def captured_piece(self, piece) -> None:
         self._captured_piece = piece
-        self._captured_piece_attrs = _clean(**piece.__dict__.copy())
+
+
+class UndoRecord:
+    """
+    What `Board.unmake_move` needs to put the sprites back after a move.
+    Castling rights, the en passant square and the halfmove clock are
+    restored by the position itself, from its own history.
+    """
+
+    __slots__ = ("move", "captured", "captured_square", "first_move", "enpassant_able")
+
+    def __init__(
+        self,
+        move: Move,
+        captured: Optional[AbstractPiece],
+        captured_square: Optional[Square],
+        first_move: bool,
+        enpassant_able: bool,
+    ) -> None:
+        self.move = move
+        self.captured = captured
+        self.captured_square = captured_square
+        self.first_move = first_move
+        self.enpassant_able = enpassant_able
 
 
 class Move:
@@ -75,9 +91,11 @@ class Move:
         self.from_sq = from_sq
         self.to_sq = to_sq
         self.flag = flag
-        _moved_piece = cast(AbstractPiece, from_sq.piece)
+        # Matching encoded headless move (see `core.move`), set by the
+        # generator that produced this move.
+        self.core_move: Optional[int] = None
+        _moved_piece = cast("AbstractPiece", from_sq.piece)
         self.pieces = MovePieceHolder(_moved_piece)
-        self.piece_attrs = _clean(**_moved_piece.__dict__.copy())
         self.turn = _moved_piece.color
         if self.to_sq.piece:
             _captured_piece = self.to_sq.piece
@@ -150,11 +168,18 @@ class EnpassantMove(Move):
 
 
 class PromoteMove(Move):
-    def __init__(self, from_sq: Square, to_sq: Square):
+    def __init__(self, from_sq: Square, to_sq: Square, promote_to=None):
         super().__init__(from_sq, to_sq, Flag.PROMOTE)
+        # Piece class to promote to, the pawn's default (Queen) if None.
+        self.promote_to = promote_to
 
     def perform(self, board):
-        super().perform(board)
+        if self.promote_to is None:
+            super().perform(board)
+            return
+        pawn = self.pieces.moved_piece
+        pawn.promote(self.promote_to)
+        pawn.forceMove(self.to_sq)
 
 
 class MoveHandler:
@@ -165,9 +190,7 @@ class MoveHandler:
         self.lights_moves = []
         self.darks_moves = []
 
-        self._undo_stack = []
         self._redo_stack = []
-        self._history_position = 0
 
     def try_move(self, move: Move):
         """
@@ -187,37 +210,31 @@ class MoveHandler:
         piece.moveToSquare(to_sq, board)
         self.turn = logic.switch_turn(turn)
         self.endTurn()
-        self._undo_stack.append(move)
-        self._history_position += 1
         return True
 
+    def make_move(self, move: Move):
+        """Play a generated move on the board. Starts a new line, so redo is cleared."""
+        self.board.make_move(move)
+        self._redo_stack.clear()
+        self.turn = logic.switch_turn(move.turn)
+
     def undo(self):
         """Undoes a move"""
-        if self._history_position <= 0:
+        if not self.board.undo_stack:
             print("Nothing to undo")
             return
-        self._history_position -= 1
-        move = self._undo_stack.pop()
+        move = self.board.unmake_move()
         self._redo_stack.append(move)
-
         self.turn = move.turn
-        piece_moved = move.pieces.moved_piece
-        piece_moved.set_attrs_from_dict(**move.piece_attrs)
-
-        piece_captured = move.captured_piece
-        if piece_captured:
-            piece_captured.set_attrs_from_dict(**move.pieces.captured_piece_attrs)
-
-        self.board.set_piece(piece_moved, move.from_sq)
-        self.board.set_piece(piece_captured, move.to_sq)
 
     def redo(self):
         """Replays move if one is available."""
-        try:
-            move = self._redo_stack.pop()
-            self.try_move(move)
-        except IndexError:
+        if not self._redo_stack:
             print("Nothing to redo")
+            return
+        move = self._redo_stack.pop()
+        self.board.make_move(move)
+        self.turn = logic.switch_turn(move.turn)
 
     def generate_moves(self):
         """Generated possible moves at a given instance - will be removed"""
@@ -236,14 +253,15 @@ class MoveHandler:
         board = self.board
         board.reset_squares()
 
+        # Attack maps are shared with the move generator, see core.attacks.
+        position = board.position
         if not turn:
-            side = self.lights_moves + self.darks_moves
+            attacked = position.attacks(WHITE).squares | position.attacks(BLACK).squares
         else:
-            side = self.lights_moves if self.turn == c.Color.LIGHT else self.darks_moves
+            attacked = position.attacks(color_from_enum(self.turn)).squares
 
-        for loc in side:
-            if square := board.map.get(loc):
-                square.isAttacked = True
+        for index in iter_bits(attacked):
+            board.get(Location.from_index(index)).isAttacked = True
 
     def endTurn(self):
         self.board.deselect()
@@ -0,0 +1,129 @@
+"""
+Perft and divide for the headless core. Runs without pygame or a display.
+
+    python perft.py 4
+    python perft.py 3 --fen "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1" --divide
+    python perft.py --suite
+    python perft.py 5 --workers 1 2 4 --hash 64
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Iterable, List, Optional
+
+from core.backends import BACKENDS, DEFAULT_BACKEND, new_position
+from core.perft import PERFT_POSITIONS, PerftHash, divide, parallel_perft, perft
+from core.position import START_FEN
+
+# Depth the reference positions are checked to when --suite is given none.
+SUITE_DEPTH = 3
+
+
+def _rate(nodes: int, seconds: float) -> str:
+    return f"{nodes / seconds if seconds else 0.0:,.0f} nodes/s"
+
+
+def run_one(fen: str, depth: int, backend: str, show_divide: bool, hash_mb: float) -> int:
+    """Perft a single position, optionally split by root move."""
+    position = new_position(fen, backend)
+    table = PerftHash(hash_mb) if hash_mb else None
+    start = time.perf_counter()
+    if show_divide:
+        counts = divide(position, depth, table)
+        for move, count in sorted(counts.items()):
+            print(f"{move}: {count}")
+        nodes = sum(counts.values())
+        print()
+    else:
+        nodes = perft(position, depth, table)
+    if table is not None:
+        print(f"hash: {len(table)} entries, {table.hits}/{table.probes} hits")
+    seconds = time.perf_counter() - start
+    print(f"depth {depth}: {nodes} nodes in {seconds:.3f}s, {_rate(nodes, seconds)}")
+    return nodes
+
+
+def run_scaling(
+    fen: str, depth: int, backend: str, workers: List[int], split_depth: int, hash_mb: float
+) -> None:
+    """Parallel perft once per worker count, with speed relative to the first."""
+    position = new_position(fen, backend)
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        nodes = parallel_perft(position, depth, count, split_depth, hash_mb)
+        seconds = time.perf_counter() - start
+        rate = nodes / seconds if seconds else 0.0
+        baseline = baseline or rate
+        print(
+            f"  {count:>3} workers {nodes:>12} nodes in {seconds:8.3f}s "
+            f"{rate:>12,.0f}/s  x{rate / baseline:.2f}"
+        )
+
+
+def run_suite(depth: int, backend: str, names: Iterable[str]) -> bool:
+    """
+    Perft every reference position to `depth` (or as deep as its known
+    counts go) and check the counts. Returns True if they all match.
+    """
+    passed = True
+    total_nodes = 0
+    total_seconds = 0.0
+    for name in names:
+        fen, expected = PERFT_POSITIONS[name]
+        position = new_position(fen, backend)
+        for ply in range(1, min(depth, len(expected)) + 1):
+            start = time.perf_counter()
+            nodes = perft(position, ply)
+            seconds = time.perf_counter() - start
+            total_nodes += nodes
+            total_seconds += seconds
+            ok = nodes == expected[ply - 1]
+            passed = passed and ok
+            print(
+                f"  {'ok  ' if ok else 'FAIL'} {name:<20} depth {ply} "
+                f"{nodes:>12} (expected {expected[ply - 1]}) {_rate(nodes, seconds)}"
+            )
+    print(f"{total_nodes} nodes in {total_seconds:.3f}s, {_rate(total_nodes, total_seconds)}")
+    return passed
+
+
+def main(argv=None) -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "depth", type=int, nargs="?",
+        help=f"plies to count, {SUITE_DEPTH} by default with --suite",
+    )
+    parser.add_argument("--fen", default=START_FEN)
+    parser.add_argument(
+        "--position", choices=list(PERFT_POSITIONS), help="named reference position"
+    )
+    parser.add_argument("--divide", action="store_true", help="node count per root move")
+    parser.add_argument("--suite", action="store_true", help="check every reference position")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=list(BACKENDS))
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="run in a process pool, once per worker count"
+    )
+    parser.add_argument(
+        "--split-depth", type=int, default=1, help="plies below the root to split at"
+    )
+    parser.add_argument("--hash", type=float, default=0, help="perft hash size in MB")
+    args = parser.parse_args(argv)
+
+    if args.suite:
+        depth = args.depth or SUITE_DEPTH
+        return 0 if run_suite(depth, args.backend, PERFT_POSITIONS) else 1
+    if args.depth is None:
+        parser.error("a depth is needed unless --suite is given")
+    fen = PERFT_POSITIONS[args.position][0] if args.position else args.fen
+    if args.workers:
+        run_scaling(fen, args.depth, args.backend, args.workers, args.split_depth, args.hash)
+    else:
+        run_one(fen, args.depth, args.backend, args.divide, args.hash)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Search a position for its best move. Runs without pygame or a display.
+
+    python search.py --depth 5
+    python search.py --movetime 2 --fen "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"
+    python search.py --nodes 100000 --position kiwipete --backend bitboard
+    python search.py --depth 6 --hash 64
+    python search.py --depth 5 --workers 1 2 4 8
+    python search.py --depth 4 --nnue network.nnue
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+from core.backends import BACKENDS, DEFAULT_BACKEND, new_position
+from core.move import Move
+from core.perft import PERFT_POSITIONS
+from core.position import START_FEN
+from core.search import DEFAULT_HASH_MB, Search
+from core.smp import parallel_search
+
+
+def run_scaling(fen: str, depth: int, backend: str, workers: List[int], hash_mb: float) -> None:
+    """Lazy SMP once per worker count, with time to depth relative to the first."""
+    position = new_position(fen, backend)
+    baseline = None
+    for count in workers:
+        result = parallel_search(position, depth, count, hash_mb)
+        baseline = baseline or result.seconds
+        print(
+            f"  {count:>3} workers {result.nodes:>10} nodes in {result.seconds:8.3f}s "
+            f"speedup x{baseline / result.seconds:.2f}  {result}"
+        )
+
+
+def main(argv=None) -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fen", default=START_FEN)
+    parser.add_argument(
+        "--position", choices=list(PERFT_POSITIONS), help="named reference position"
+    )
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=list(BACKENDS))
+    parser.add_argument("--depth", type=int, default=0, help="plies to search")
+    parser.add_argument("--nodes", type=int, default=0, help="node limit")
+    parser.add_argument("--movetime", type=float, default=0.0, help="time limit in seconds")
+    parser.add_argument(
+        "--hash", type=float, default=DEFAULT_HASH_MB,
+        help="transposition table size in MB, 0 for none",
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="Lazy SMP to --depth, once per worker count"
+    )
+    parser.add_argument(
+        "--no-ordering", action="store_true", help="search moves in generation order"
+    )
+    parser.add_argument(
+        "--nnue", metavar="PATH", help="evaluate with a network from train_nnue.py"
+    )
+    args = parser.parse_args(argv)
+
+    fen = PERFT_POSITIONS[args.position][0] if args.position else args.fen
+    if args.workers:
+        # Workers search with the default settings to a fixed depth.
+        for given, option in (
+            (args.nnue, "--nnue"),
+            (args.no_ordering, "--no-ordering"),
+            (args.nodes, "--nodes"),
+            (args.movetime, "--movetime"),
+        ):
+            if given:
+                parser.error(f"{option} can't be combined with --workers")
+        run_scaling(fen, args.depth or 4, args.backend, args.workers, args.hash)
+        return 0
+    evaluate = None
+    if args.nnue:
+        from core.nnue import Network, NNUEEvaluator
+
+        evaluate = NNUEEvaluator(Network.load(args.nnue))
+    search = Search(
+        new_position(fen, args.backend),
+        evaluate=evaluate,
+        hash_mb=args.hash,
+        ordering=not args.no_ordering,
+    )
+    if not (args.depth or args.nodes or args.movetime):
+        args.depth = 4
+    result = search.run(args.depth, args.nodes, args.movetime, on_iteration=print)
+    table = search.table
+    if table is not None:
+        print(
+            f"hash: {len(table)} entries, {table.hits}/{table.probes} hits "
+            f"({table.hit_rate:.1%}), {table.fill_rate():.1%} full"
+        )
+    pawn_hash = getattr(search.evaluate, "pawn_hash", None)
+    if pawn_hash is not None:
+        print(f"pawn hash: {pawn_hash.hits}/{pawn_hash.probes} hits ({pawn_hash.hit_rate:.1%})")
+    print(
+        f"cutoffs: {search.cutoffs}, {search.first_move_cutoff_rate:.1%} on the first move"
+    )
+    if result.best_move:
+        print(f"bestmove {Move.from_code(result.best_move).uci()}")
+    else:
+        print("bestmove (none)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import pytest
+
+from core.backends import BACKENDS, generator_for, new_position
+from core.perft import PERFT_POSITIONS, perft
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("name", list(PERFT_POSITIONS))
+def test_tracked_attacks_match_a_full_build(backend, name):
+    fen, expected = PERFT_POSITIONS[name]
+    position = new_position(fen, backend)
+    # Debug tracking checks every make and unmake against a recompute.
+    position.track_attacks(debug=True)
+    assert perft(position, 2) == expected[1]
+    untracked = new_position(fen, backend)
+    for color in (0, 1):
+        assert position.attacks(color).squares == untracked.attacks(color).squares
+
+
+def test_debug_tracking_catches_drift():
+    position = new_position(PERFT_POSITIONS["kiwipete"][0])
+    position.track_attacks(debug=True)
+    # The a1 rook's attacks, which g2-g3 leaves alone.
+    position.tracker.piece_attacks[0] ^= 1 << 9
+    generator = generator_for(position)
+    generator.generate_moves()
+    move = generator.lookup(14, 22)
+    assert move
+    with pytest.raises(AssertionError):
+        position.make_move(move)
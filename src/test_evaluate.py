@@ -0,0 +1,27 @@
+import pytest
+
+from benchmark import playout_positions
+from core.backends import BACKENDS
+from core.evaluate import Evaluator
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_incremental_and_pawn_hash_match_a_full_evaluation(backend):
+    hashed, unhashed = Evaluator(), Evaluator(pawn_hash_mb=0)
+    for position in playout_positions(300, backend):
+        expected = hashed.full(position)
+        assert hashed(position) == expected
+        assert unhashed(position) == expected
+    assert hashed.pawn_hash.hits
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_batch_matches_the_scalar_evaluator(backend):
+    pytest.importorskip("numpy")
+    from core.batch import encode_bitboards, encode_planes, evaluate_batch
+
+    positions = playout_positions(300, backend)
+    scalar = Evaluator()
+    expected = [scalar(position) for position in positions]
+    assert evaluate_batch(encode_planes(positions), mobility=False).tolist() == expected
+    assert evaluate_batch(encode_bitboards(positions), mobility=False).tolist() == expected
@@ -0,0 +1,34 @@
+import pytest
+
+from core.backends import BACKENDS, generator_for, new_position
+from core.perft import PERFT_POSITIONS
+
+FENS = [fen for fen, _ in PERFT_POSITIONS.values()] + [
+    # In check, and in double check.
+    "rnbqkbnr/ppp2ppp/8/1B1pp3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3",
+    "4k3/8/8/8/8/5n2/8/4K2r w - - 0 1",
+]
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("fen", FENS)
+def test_staged_moves_match_generate_moves(backend, fen):
+    position = new_position(fen, backend)
+    generator = generator_for(position)
+    expected = sorted(generator.generate_moves())
+    assert sorted(generator.staged_moves()) == expected
+    assert sorted(generator.staged_moves(0, sorted)) == expected
+    for hash_move in (expected[0], expected[-1]):
+        staged = list(generator.staged_moves(hash_move))
+        assert staged[0] == hash_move
+        assert sorted(staged) == expected
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_staged_moves_skip_an_illegal_hash_move(backend):
+    position = new_position(PERFT_POSITIONS["kiwipete"][0], backend)
+    generator = generator_for(position)
+    expected = sorted(generator.generate_moves())
+    # a1 to a8: the rook is blocked.
+    staged = list(generator.staged_moves(56 << 6))
+    assert sorted(staged) == expected
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from core.backends import BACKENDS, generator_for, new_position
+from core.perft import PERFT_POSITIONS
+
+np = pytest.importorskip("numpy")
+from core.nnue import FEATURES, HIDDEN, Network, NNUEEvaluator  # noqa: E402
+
+
+def small_network(size: int = 8) -> Network:
+    rng = np.random.default_rng(0)
+    return Network(
+        rng.integers(-64, 64, (FEATURES, size), dtype=np.int16),
+        rng.integers(-64, 64, size, dtype=np.int16),
+        rng.integers(-64, 64, (HIDDEN, 2 * size), dtype=np.int16),
+        rng.integers(-64, 64, HIDDEN, dtype=np.int32),
+        rng.integers(-64, 64, HIDDEN, dtype=np.int16),
+        np.array(0, np.int32),
+    )
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_accumulator_follows_random_moves(backend):
+    evaluator = NNUEEvaluator(small_network())
+    rng = random.Random(0)
+    position = new_position(PERFT_POSITIONS["kiwipete"][0], backend)
+    evaluator(position)
+    played = 0
+    for ply in range(60):
+        moves = list(generator_for(position).generate_moves())
+        if not moves:
+            break
+        position.make_move(rng.choice(moves))
+        played += 1
+        if ply % 3 == 0:
+            # Some changes are left pending across several moves.
+            assert evaluator(position) == evaluator.full(position)
+        position.accumulator.verify()
+    for _ in range(played):
+        position.unmake_move()
+        position.accumulator.verify()
+
+
+def test_network_save_and_load(tmp_path):
+    network = small_network()
+    path = str(tmp_path / "small.nnue")
+    network.save(path)
+    position = new_position(PERFT_POSITIONS["position4"][0])
+    assert NNUEEvaluator(Network.load(path)).full(position) == NNUEEvaluator(network).full(
+        position
+    )
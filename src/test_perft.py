@@ -0,0 +1,20 @@
+import pytest
+
+from core.backends import BACKENDS, new_position
+from core.perft import PERFT_POSITIONS, PerftHash, perft
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("name", list(PERFT_POSITIONS))
+def test_perft_depth_3(backend, name):
+    fen, expected = PERFT_POSITIONS[name]
+    assert perft(new_position(fen, backend), 3) == expected[2]
+
+
+def test_perft_hash_keeps_counts():
+    fen, expected = PERFT_POSITIONS["kiwipete"]
+    table = PerftHash(1)
+    position = new_position(fen)
+    assert perft(position, 3, table) == expected[2]
+    assert perft(position, 3, table) == expected[2]
+    assert table.hits
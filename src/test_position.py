@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from core.backends import BACKENDS, generator_for, new_position
+from core.perft import PERFT_POSITIONS
+from core.pst import compute_scores
+from core.zobrist import compute_key, compute_pawn_key
+
+
+def state(position):
+    return (
+        position.fen(),
+        position.key,
+        position.pawn_key,
+        position.mg_score,
+        position.eg_score,
+        position.phase,
+    )
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("name", list(PERFT_POSITIONS))
+def test_make_unmake_restores_the_position(backend, name):
+    position = new_position(PERFT_POSITIONS[name][0], backend)
+    before = state(position)
+    for move in list(generator_for(position).generate_moves()):
+        position.make_move(move)
+        assert position.key == compute_key(position)
+        assert position.pawn_key == compute_pawn_key(position)
+        assert (position.mg_score, position.eg_score, position.phase) == compute_scores(
+            position
+        )
+        position.unmake_move()
+        assert state(position) == before
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_random_games_keep_incremental_terms(backend):
+    rng = random.Random(0)
+    position = new_position(PERFT_POSITIONS["kiwipete"][0], backend)
+    start = state(position)
+    played = 0
+    for _ in range(80):
+        moves = list(generator_for(position).generate_moves())
+        if not moves:
+            break
+        position.make_move(rng.choice(moves))
+        played += 1
+        assert position.key == compute_key(position)
+        assert position.pawn_key == compute_pawn_key(position)
+    for _ in range(played):
+        position.unmake_move()
+    assert state(position) == start
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("name", list(PERFT_POSITIONS))
+def test_fen_and_bytes_round_trip(backend, name):
+    fen = PERFT_POSITIONS[name][0]
+    position = new_position(fen, backend)
+    assert position.fen() == fen
+    unpacked = BACKENDS[backend][0].from_bytes(position.to_bytes())
+    assert state(unpacked) == state(position)
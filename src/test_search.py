@@ -0,0 +1,17 @@
+from core.backends import new_position
+from core.search import Search, MATE
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def test_quiescence_checks_stay_bounded():
+    # Every evasion at every quiescence ply took this to ~140,000 nodes.
+    search = Search(new_position(KIWIPETE), ordering=False)
+    result = search.run(depth=2)
+    assert result.nodes < 40000
+
+
+def test_quiescence_finds_mate_at_the_horizon():
+    search = Search(new_position("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"))
+    result = search.run(depth=1)
+    assert result.score == MATE - 1
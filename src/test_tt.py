@@ -0,0 +1,50 @@
+from core.tt import EXACT, LOWER, UPPER, TranspositionTable
+
+# Two keys that share a slot in any table up to 2**32 entries.
+KEY = 0x1234_5678_0000_0001
+OTHER = 0x8765_4321_0000_0001
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    assert table.probe(KEY) is None
+    table.store(KEY, 5, -120, LOWER, 777)
+    assert table.probe(KEY) == (777, -120, 5, LOWER)
+    assert table.probe(OTHER) is None
+
+
+def test_same_position_keeps_its_move():
+    table = TranspositionTable(1)
+    table.store(KEY, 5, 30, LOWER, 777)
+    table.store(KEY, 2, 10, UPPER, 0)
+    assert table.probe(KEY) == (777, 10, 2, UPPER)
+
+
+def test_deeper_entry_survives_in_its_search():
+    table = TranspositionTable(1)
+    table.new_search()
+    table.store(KEY, 6, 50, EXACT, 777)
+    table.store(OTHER, 3, 20, EXACT, 888)
+    assert table.probe(KEY) == (777, 50, 6, EXACT)
+    assert table.probe(OTHER) is None
+    table.store(OTHER, 6, 20, EXACT, 888)
+    assert table.probe(OTHER) == (888, 20, 6, EXACT)
+
+
+def test_older_entry_gives_way_after_a_new_search():
+    table = TranspositionTable(1)
+    table.new_search()
+    table.store(KEY, 6, 50, EXACT, 777)
+    table.new_search()
+    assert table.probe(KEY) == (777, 50, 6, EXACT)
+    table.store(OTHER, 1, 20, EXACT, 888)
+    assert table.probe(OTHER) == (888, 20, 1, EXACT)
+    assert table.probe(KEY) is None
+
+
+def test_generations_wrap_without_hitting_zero():
+    table = TranspositionTable(1)
+    for _ in range(200):
+        table.new_search()
+        table.store(KEY, 1, 0, EXACT, 1)
+        assert table.probe(KEY) is not None
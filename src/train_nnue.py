@@ -0,0 +1,228 @@
+"""
+Train an NNUE network (see core.nnue) to match the hand-crafted evaluation.
+Runs without pygame or a display.
+
+    python train_nnue.py --positions 200000 --epochs 10
+    python train_nnue.py --hidden 128 --out big.nnue
+
+Positions come from random games out of the benchmark positions, scored by
+the batch evaluator (`core.batch`), which gives exactly the search
+evaluator's scores. Training is plain NumPy in float32, with Adam and a
+loss on win probability rather than centipawns, so lopsided positions
+don't swamp the rest. HalfKP has a separate weight row for every king
+square, and most of them see few positions. So each row is learned as the
+sum of its own weights and a shared row for its (piece, square) alone, and
+the two are added together when the network is quantised and saved.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from benchmark import playout_positions
+from core.backends import DEFAULT_BACKEND
+from core.batch import encode_boards, encode_planes, evaluate_batch
+from core.constants import WHITE, BLACK, KING
+from core.nnue import (
+    ACTIVATION_SCALE,
+    EVAL_SCALE,
+    FEATURES,
+    HIDDEN,
+    PIECE_FEATURES,
+    PIECE_OFFSETS,
+    WEIGHT_SCALE,
+    Network,
+)
+
+DEFAULT_PATH = "network.nnue"
+# Most pieces other than kings a position can have.
+MAX_FEATURES = 30
+
+_OFFSETS = np.array(PIECE_OFFSETS)
+
+
+def batch_features(boards: np.ndarray, perspective: int) -> np.ndarray:
+    """
+    (N, MAX_FEATURES) features set from `perspective` for (N, 64) boards,
+    padded with FEATURES, the index of an all-zero row.
+    """
+    flip = 56 * perspective
+    kings = np.argmax(boards == (KING | perspective << 3), axis=1) ^ flip
+    offsets = _OFFSETS[perspective][boards]
+    features = kings[:, None] * PIECE_FEATURES + offsets + (np.arange(64) ^ flip)
+    features[offsets < 0] = FEATURES
+    first = np.argsort(offsets < 0, axis=1, kind="stable")[:, :MAX_FEATURES]
+    return np.take_along_axis(features, first, axis=1)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(x, -30, 30)))
+
+
+class Trainer:
+    """The network in float32, with its Adam state."""
+
+    def __init__(self, hidden_size: int, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+
+        def normal(shape: Tuple[int, ...], scale: float) -> np.ndarray:
+            return (rng.standard_normal(shape) * scale).astype(np.float32)
+
+        self.params: Dict[str, np.ndarray] = {
+            # An extra zero row each for padding.
+            "ft": np.zeros((FEATURES + 1, hidden_size), np.float32),
+            "factor": normal((PIECE_FEATURES + 1, hidden_size), 0.05),
+            "ft_bias": np.full(hidden_size, 0.5, np.float32),
+            "hidden": normal((HIDDEN, 2 * hidden_size), 1 / np.sqrt(hidden_size)),
+            "hidden_bias": np.zeros(HIDDEN, np.float32),
+            "output": normal((HIDDEN,), 1 / np.sqrt(HIDDEN)),
+            "output_bias": np.zeros(1, np.float32),
+        }
+        self.params["factor"][PIECE_FEATURES] = 0
+        self.moments = {
+            name: (np.zeros_like(values), np.zeros_like(values))
+            for name, values in self.params.items()
+        }
+        self.steps = 0
+
+    def _accumulate(self, features: np.ndarray) -> np.ndarray:
+        params = self.params
+        factors = np.where(features == FEATURES, PIECE_FEATURES, features % PIECE_FEATURES)
+        return (
+            params["ft_bias"]
+            + params["ft"][features].sum(axis=1)
+            + params["factor"][factors].sum(axis=1)
+        )
+
+    def predict(self, us: np.ndarray, them: np.ndarray) -> np.ndarray:
+        """Output for batches of features, 1.0 being EVAL_SCALE centipawns."""
+        return self._forward(us, them)[-1]
+
+    def _forward(self, us: np.ndarray, them: np.ndarray) -> Tuple[np.ndarray, ...]:
+        params = self.params
+        first = np.concatenate((self._accumulate(us), self._accumulate(them)), axis=1)
+        inputs = np.clip(first, 0, 1)
+        hidden_in = inputs @ params["hidden"].T + params["hidden_bias"]
+        hidden = np.clip(hidden_in, 0, 1)
+        output = hidden @ params["output"] + params["output_bias"][0]
+        return first, inputs, hidden_in, hidden, output
+
+    def step(self, us: np.ndarray, them: np.ndarray, targets: np.ndarray, rate: float) -> float:
+        """One Adam step on a batch, returning its loss."""
+        params = self.params
+        first, inputs, hidden_in, hidden, output = self._forward(us, them)
+        predicted = _sigmoid(output)
+        wanted = _sigmoid(targets / EVAL_SCALE)
+        loss = float(np.mean((predicted - wanted) ** 2))
+
+        d_output = 2 * (predicted - wanted) * predicted * (1 - predicted) / len(targets)
+        grads = {
+            "output": hidden.T @ d_output,
+            "output_bias": np.array([d_output.sum()], np.float32),
+        }
+        d_hidden = np.outer(d_output, params["output"]) * ((hidden_in > 0) & (hidden_in < 1))
+        grads["hidden"] = d_hidden.T @ inputs
+        grads["hidden_bias"] = d_hidden.sum(axis=0)
+        d_first = (d_hidden @ params["hidden"]) * ((first > 0) & (first < 1))
+        size = params["ft_bias"].shape[0]
+        d_us, d_them = d_first[:, :size], d_first[:, size:]
+        grads["ft_bias"] = d_us.sum(axis=0) + d_them.sum(axis=0)
+
+        # Feature rows only get gradients where they were set, so only those
+        # rows are updated, and only their moments decay.
+        features = np.concatenate((us, them))
+        d_rows = np.repeat(np.concatenate((d_us, d_them)), features.shape[1], axis=0)
+        rows, inverse = np.unique(features, return_inverse=True)
+        d_ft = np.zeros((len(rows), size), np.float32)
+        np.add.at(d_ft, inverse.reshape(-1), d_rows)
+        factors = np.where(rows == FEATURES, PIECE_FEATURES, rows % PIECE_FEATURES)
+        factor_rows, factor_inverse = np.unique(factors, return_inverse=True)
+        d_factor = np.zeros((len(factor_rows), size), np.float32)
+        np.add.at(d_factor, factor_inverse.reshape(-1), d_ft)
+
+        self.steps += 1
+        for name, grad in grads.items():
+            self._adam(name, slice(None), grad, rate)
+        self._adam("ft", rows, d_ft, rate)
+        self._adam("factor", factor_rows, d_factor, rate)
+        params["ft"][FEATURES] = 0
+        params["factor"][PIECE_FEATURES] = 0
+        return loss
+
+    def _adam(self, name: str, rows, grad: np.ndarray, rate: float) -> None:
+        first, second = self.moments[name]
+        first[rows] = 0.9 * first[rows] + 0.1 * grad
+        second[rows] = 0.999 * second[rows] + 0.001 * grad * grad
+        corrected = rate * np.sqrt(1 - 0.999 ** self.steps) / (1 - 0.9 ** self.steps)
+        self.params[name][rows] -= corrected * first[rows] / (np.sqrt(second[rows]) + 1e-8)
+
+    def quantise(self) -> Network:
+        params = self.params
+        ft = params["ft"][:FEATURES].reshape(64, PIECE_FEATURES, -1)
+        ft = (ft + params["factor"][:PIECE_FEATURES]).reshape(FEATURES, -1)
+
+        def rounded(values: np.ndarray, scale: float, dtype) -> np.ndarray:
+            limit = np.iinfo(dtype).max
+            return np.clip(np.round(values * scale), -limit, limit).astype(dtype)
+
+        both = ACTIVATION_SCALE * WEIGHT_SCALE
+        return Network(
+            rounded(ft, ACTIVATION_SCALE, np.int16),
+            rounded(params["ft_bias"], ACTIVATION_SCALE, np.int16),
+            rounded(params["hidden"], WEIGHT_SCALE, np.int16),
+            rounded(params["hidden_bias"], both, np.int32),
+            rounded(params["output"], WEIGHT_SCALE, np.int16),
+            rounded(params["output_bias"][0], both, np.int32),
+        )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--positions", type=int, default=200000)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--hidden", type=int, default=64, help="feature transformer units")
+    parser.add_argument("--batch", type=int, default=1024)
+    parser.add_argument("--rate", type=float, default=0.001, help="Adam learning rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    positions = playout_positions(args.positions, DEFAULT_BACKEND, args.seed)
+    boards = encode_boards(positions)
+    targets = evaluate_batch(encode_planes(positions), mobility=False).astype(np.float32)
+    sides = boards.sides.astype(np.intp)
+    white, black = batch_features(boards.pieces, WHITE), batch_features(boards.pieces, BLACK)
+    # Side to move first.
+    us = np.where(sides[:, None] == WHITE, white, black)
+    them = np.where(sides[:, None] == WHITE, black, white)
+    del positions
+    held_out = len(targets) // 10
+    print(f"{len(targets)} positions in {time.perf_counter() - start:.1f}s, {held_out} held out")
+
+    trainer = Trainer(args.hidden, args.seed)
+    rng = np.random.default_rng(args.seed)
+    for epoch in range(1, args.epochs + 1):
+        order = rng.permutation(np.arange(held_out, len(targets)))
+        losses = []
+        for begin in range(0, len(order), args.batch):
+            batch = order[begin : begin + args.batch]
+            losses.append(trainer.step(us[batch], them[batch], targets[batch], args.rate))
+        predicted = trainer.predict(us[:held_out], them[:held_out]) * EVAL_SCALE
+        error = np.abs(predicted - targets[:held_out])
+        print(
+            f"epoch {epoch:>3} loss {np.mean(losses):.5f}  held out: "
+            f"mean error {error.mean():.0f}cp, median {np.median(error):.0f}cp  "
+            f"({time.perf_counter() - start:.0f}s)"
+        )
+
+    network = trainer.quantise()
+    network.save(args.out)
+    print(f"saved {network} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()